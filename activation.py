@@ -0,0 +1,155 @@
+#!/usr/bin/python
+#
+# activation.py
+#
+# 2026/10/18
+# rg
+#
+# sigmoid activation functions, with a choice of precision. every network built while a mode is set uses that mode:
+#
+#   exact     1 / (1 + exp(-x)), saturating to 0 and 1 beyond +/-100. the reference.
+#   table     linear interpolation in a table of sigmoid sampled every 1/32 over [-16, 16], clamped beyond.
+#             max abs error vs exact: 1.2e-5.
+#   rational  0.5 + 0.5 * tanh(x / 2), with tanh from its [7/6] Pade approximant over |x| < 10 and 0 or 1 beyond.
+#             max abs error vs exact: 5.1e-5.
+#
+# the error bounds are checked by measure_error(). how often the approximations change a strategy's decisions is
+# measured by measure_decision_divergence().
+
+from math import exp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MODES = ('exact', 'table', 'rational')
+ERROR_BOUNDS = {'exact': 0.0, 'table': 1.2e-5, 'rational': 5.1e-5}
+
+# the mode used by networks built from now on
+mode = 'exact'
+
+
+def set_mode(new_mode):
+    global mode
+    assert new_mode in MODES, "unknown activation mode: " + str(new_mode)
+    mode = new_mode
+
+
+def sigmoid_exact(num):
+    if -num > 100:
+        return 0
+    elif -num < -100:
+        return 1
+    else:
+        return 1 / (1 + exp(-num))
+
+
+table_limit = 16.0
+table_resolution = 32
+table = [sigmoid_exact(-table_limit + float(i) / table_resolution)
+         for i in range(int(2 * table_limit * table_resolution) + 1)]
+
+
+def sigmoid_table(num):
+    position = (num + table_limit) * table_resolution
+    if position <= 0:
+        return table[0]
+    elif position >= len(table) - 1:
+        return table[-1]
+    index = int(position)
+    low = table[index]
+    return low + (table[index + 1] - low) * (position - index)
+
+
+rational_limit = 10.0
+
+
+def sigmoid_rational(num):
+    if num >= rational_limit:
+        return 1.0
+    elif num <= -rational_limit:
+        return 0.0
+    half = 0.5 * num
+    square = half * half
+    tanh = half * (135135 + square * (17325 + square * (378 + square))) / \
+        (135135 + square * (62370 + square * (3150 + 28 * square)))
+    return 0.5 + 0.5 * tanh
+
+
+SIGMOIDS = {'exact': sigmoid_exact, 'table': sigmoid_table, 'rational': sigmoid_rational}
+
+
+# the sigmoid for the current mode (or the one given)
+def get_sigmoid(for_mode=None):
+    return SIGMOIDS[for_mode or mode]
+
+
+if numpy is not None:
+    def vector_sigmoid_exact(nums):
+        sigmoided = 1 / (1 + numpy.exp(-numpy.clip(nums, -100, 100)))
+        sigmoided[nums > 100] = 1
+        sigmoided[nums < -100] = 0
+        return sigmoided
+
+    vector_table_points = numpy.linspace(-table_limit, table_limit, len(table))
+    vector_table = numpy.array(table)
+
+    def vector_sigmoid_table(nums):
+        return numpy.interp(nums, vector_table_points, vector_table)
+
+    def vector_sigmoid_rational(nums):
+        half = 0.5 * numpy.clip(nums, -rational_limit, rational_limit)
+        square = half * half
+        sigmoided = 0.5 + 0.5 * half * (135135 + square * (17325 + square * (378 + square))) / \
+            (135135 + square * (62370 + square * (3150 + 28 * square)))
+        sigmoided[nums >= rational_limit] = 1
+        sigmoided[nums <= -rational_limit] = 0
+        return sigmoided
+
+    VECTOR_SIGMOIDS = {'exact': vector_sigmoid_exact, 'table': vector_sigmoid_table,
+                       'rational': vector_sigmoid_rational}
+
+
+# the numpy sigmoid for the current mode (or the one given)
+def get_vector_sigmoid(for_mode=None):
+    return VECTOR_SIGMOIDS[for_mode or mode]
+
+
+# largest abs difference from the exact sigmoid, sampled every step over [-limit, limit]
+def measure_error(for_mode, limit=30.0, step=0.001):
+    approximation = SIGMOIDS[for_mode]
+    worst = 0.0
+    for i in range(int(2 * limit / step) + 1):
+        num = -limit + i * step
+        worst = max(worst, abs(approximation(num) - sigmoid_exact(num)))
+    return worst
+
+
+# the fraction of decisions that change when networks use the given mode instead of the exact sigmoid. each of
+# genomes random GinNeuralNets is pulsed over the same series of game states, once per mode.
+def measure_decision_divergence(for_mode, engine='compiled', genomes=5, pulses=200):
+    # imported here, as neuralengine imports us
+    from neuralengine import record_states, replay_decisions
+
+    observers, states = record_states(pulses)
+    decisions, changed = 0, 0
+    for _ in range(genomes):
+        weightset = random_gin_weightset(observers)
+        exact = replay_decisions(observers, states, weightset, engine, 'exact')
+        approximate = replay_decisions(observers, states, weightset, engine, for_mode)
+        for i in range(len(exact)):
+            decisions += len(exact[i])
+            changed += len([j for j in range(len(exact[i])) if exact[i][j] != approximate[i][j]])
+
+    return float(changed) / decisions
+
+
+# weights for a GinNeuralNet over the given observers, from a random genome
+def random_gin_weightset(observers):
+    from neuralnet import WeightSet
+    from genetic_algorithm import GeneSet
+
+    num_inputs = sum([observer.width for observer in observers])
+    num_hidden = int((num_inputs + 4) * (2.0 / 3.0))
+    return WeightSet(GeneSet(4000), num_inputs, num_hidden, 4)
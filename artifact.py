@@ -0,0 +1,89 @@
+#!/usr/bin/python
+#
+# artifact.py
+#
+# 2026/10/18
+# rg
+#
+# frozen champions: a GeneSet exported with its Topology as a small, versioned file that loads straight into a
+# ready-to-run NeuralGinStrategy, with no Population to unpickle. the file is laid out as:
+#
+#   header    '<8sHHIQ': magic, format version, reserved, spec length, gene count
+#   spec      the Topology's spec() as json, padded with spaces to a multiple of 8 bytes
+#   genes     gene count little-endian float64s, just the ones the topology reads
+#
+# the genes are memory mapped. with numpy they're used in place, without it they're copied into an array.
+
+from encoder import *
+from ginstrategy import *
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+ARTIFACT_MAGIC = 'GINBRAIN'
+ARTIFACT_VERSION = 1
+ARTIFACT_HEADER = struct.Struct('<8sHHIQ')
+
+
+# write the genes the topology reads to path, returning the number of bytes written. the file is written alongside
+# and renamed into place, so anyone with the old one mapped keeps reading it.
+def export_artifact(geneset, topology, path):
+    genes = array('d', [float(gene) for gene in geneset.genes[:topology.genome_length()]])
+    assert len(genes) == topology.genome_length(), "not enough genes for the topology"
+    if sys.byteorder != 'little':
+        genes.byteswap()
+
+    spec = json.dumps(topology.spec(), sort_keys=True)
+    spec += ' ' * (-(ARTIFACT_HEADER.size + len(spec)) % 8)
+
+    with open(path + '.tmp', 'wb') as f:
+        f.write(ARTIFACT_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, 0, len(spec), len(genes)))
+        f.write(spec)
+        genes.tofile(f)
+        size = f.tell()
+    os.rename(path + '.tmp', path)
+    return size
+
+
+# a loaded artifact: its format version, Topology and genes. it stands in for a GeneSet wherever one is read from.
+class Artifact(object):
+    def __init__(self, version, topology, genes):
+        self.version = version
+        self.topology = topology
+        self.genes = genes
+
+    # a GinNeuralNet over the given observers
+    def build(self, observers, engine=None):
+        if engine is None:
+            engine = 'numpy' if numpy is not None else 'compiled'
+        return self.topology.build(observers, self, engine)
+
+    # a strategy for player us, ready to play
+    def strategy(self, us, opponent, ginmatch, engine=None):
+        return NeuralGinStrategy(us, opponent, ginmatch, self.build(ginmatch.observers_for(us), engine))
+
+
+def load_artifact(path):
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _, spec_length, gene_count = ARTIFACT_HEADER.unpack_from(mapped, 0)
+    assert magic == ARTIFACT_MAGIC, "not a network artifact: " + path
+    assert version <= ARTIFACT_VERSION, "artifact version {0} is newer than we read ({1})".format(
+        version, ARTIFACT_VERSION)
+
+    offset = ARTIFACT_HEADER.size + spec_length
+    topology = Topology.from_spec(json.loads(mapped[ARTIFACT_HEADER.size:offset]))
+    assert gene_count == topology.genome_length(), "artifact genes don't match its topology"
+
+    if numpy is not None:
+        genes = numpy.frombuffer(mapped, dtype='<f8', count=gene_count, offset=offset)
+    else:
+        genes = array('d', mapped[offset:offset + 8 * gene_count])
+        if sys.byteorder != 'little':
+            genes.byteswap()
+
+    return Artifact(version, topology, genes)
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+#
+# batchinference.py
+#
+# 2026/10/18
+# rg
+#
+# run many matches side by side and evaluate the pulses of every network in play as one batched matrix product.
+#
+# each match runs in its own thread, but only one thread runs game code at a time: a thread hands over control when
+# its strategy asks for a pulse. once every running match is waiting on a pulse, the whole batch is evaluated at
+# once and the matches carry on. since game code never runs concurrently, nothing else needs to be thread-safe.
+
+import threading
+from neuralengine import *
+
+
+# stands in for a NumpyEngine inside a NeuralNet, handing its pulses to a BatchedInference
+class BatchedEngine(object):
+    def __init__(self, batcher, slot):
+        self.batcher = batcher
+        self.slot = slot
+
+    # the batch computes every output neuron, we hand back the ones asked for
+    def evaluate(self, inputs, rows=None):
+        outputs = self.batcher.submit(self.slot, inputs)
+        if rows is not None:
+            outputs = [outputs[row] for row in rows]
+        return outputs
+
+
+class BatchedInference(object):
+    def __init__(self):
+        assert numpy is not None, "batched inference requires numpy"
+
+        # one slot per registered network, keyed by the caller (usually its GeneSet)
+        self.slots = {}
+        self.engines = []
+        self.sigmoid = get_vector_sigmoid()
+
+        # stacked copies of each engine's weights, rebuilt whenever a network is registered
+        self.input_weights = None
+        self.layers = None
+
+        # pulses waiting for the next batch: [slot, inputs, outputs]
+        self.pending = []
+        self.active = 0
+        self.condition = threading.Condition()
+
+        # tally of how much batching we got
+        self.batches = 0
+        self.pulses = 0
+
+    # register a network's weights once, returning its slot
+    def register(self, key, weightset, input_weights):
+        if key not in self.slots:
+            self.slots[key] = len(self.engines)
+            self.engines.append(NumpyEngine(weightset, input_weights))
+            self.input_weights = None
+        return self.slots[key]
+
+    # an engine factory for NeuralNet(engine=...), sharing one slot between every network built for this key
+    def engine_for(self, key):
+        def factory(weightset, input_weights):
+            return BatchedEngine(self, self.register(key, weightset, input_weights))
+        return factory
+
+    def stack(self):
+        self.input_weights = numpy.array([engine.input_weights for engine in self.engines])
+        self.layers = []
+        for i in range(len(self.engines[0].layers)):
+            self.layers.append(numpy.array([engine.layers[i] for engine in self.engines]))
+
+    # evaluate one pulse per (slot, inputs) pair, returning a (pulses x outputs) array
+    def evaluate_batch(self, slots, inputs):
+        if self.input_weights is None:
+            self.stack()
+
+        slots = numpy.array(slots)
+        signal = self.sigmoid(numpy.array(inputs, dtype=numpy.float64) * self.input_weights[slots])
+        for layer in self.layers:
+            signal = self.sigmoid(numpy.einsum('bij,bj->bi', layer[slots], signal) + 1)
+
+        self.batches += 1
+        self.pulses += len(slots)
+        return signal
+
+    # queue a pulse and wait for its batch. outside of run() there is nothing to wait for, so just evaluate it.
+    def submit(self, slot, inputs):
+        if self.active == 0:
+            return self.evaluate_batch([slot], [inputs])[0].tolist()
+
+        request = [slot, inputs, None]
+        self.pending.append(request)
+        self.flush_if_ready()
+        while request[2] is None:
+            self.condition.wait()
+        return request[2]
+
+    # evaluate the pending pulses once every running match is waiting on one
+    def flush_if_ready(self):
+        if len(self.pending) == 0 or len(self.pending) < self.active:
+            return
+
+        outputs = self.evaluate_batch([request[0] for request in self.pending],
+                                      [request[1] for request in self.pending])
+        for i in range(len(self.pending)):
+            self.pending[i][2] = outputs[i].tolist()
+        self.pending = []
+        self.condition.notify_all()
+
+    # run the given matches, at most concurrency at a time, returning their results in the same order
+    def run(self, matches, concurrency=None):
+        if concurrency is None:
+            concurrency = 32
+
+        results = [None] * len(matches)
+        queue = list(reversed(range(len(matches))))
+        errors = []
+
+        def worker():
+            with self.condition:
+                try:
+                    while queue and not errors:
+                        i = queue.pop()
+                        results[i] = matches[i].run()
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    self.active -= 1
+                    self.flush_if_ready()
+
+        threads = [threading.Thread(target=worker) for _ in range(min(concurrency, len(matches)))]
+        self.active = len(threads)
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return results
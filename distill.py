@@ -0,0 +1,198 @@
+#!/usr/bin/python
+#
+# distill.py
+#
+# 2026/10/18
+# rg
+#
+# distill a champion network into a smaller student network: record the champion's inputs and outputs over a number
+# of games it plays against itself, fit a student of a smaller Topology to reproduce those outputs (by gradient
+# descent, with numpy), and report how often the student's decisions agree with the champion's and how much faster
+# it pulses. the student is a GeneSet laid out by its Topology, so it builds into an ordinary GinNeuralNet for a
+# NeuralGinStrategy.
+
+from topology import *
+from ginmatch import *
+from ginstrategy import *
+from observer import *
+
+
+# wraps another engine, keeping a copy of each pulse's inputs and its full set of outputs. given observers, the inputs
+# kept are their raw values rather than the ones the engine is given, which differ when a network reads them through
+# a CardEncoder (see encoder.py).
+class RecordingEngine(object):
+    def __init__(self, engine, samples, observers=None):
+        self.engine = engine
+        self.samples = samples
+        self.observers = observers
+
+    def evaluate(self, inputs, rows=None):
+        outputs = self.engine.evaluate(inputs)
+        recorded = inputs
+        if self.observers is not None:
+            recorded = [observer.get_value_by_index(i) for observer in self.observers for i in range(observer.width)]
+        self.samples.append((list(recorded), outputs))
+        if rows is not None:
+            outputs = [outputs[row] for row in rows]
+        return outputs
+
+
+# an engine factory recording every pulse into samples, computed by the given engine (by name or factory). given
+# observers, their raw values are recorded as each pulse's inputs.
+def recording_engine(samples, engine=None, observers=None):
+    if engine is None:
+        engine = 'compiled'
+    if isinstance(engine, basestring):
+        assert ENGINES.get(engine) is not None, "can't record from engine: " + engine
+        engine = ENGINES[engine]
+
+    def factory(weightset, input_weights):
+        return RecordingEngine(engine(weightset, input_weights), samples, observers)
+    return factory
+
+
+# play the given number of matches with both players using the teacher's network, returning
+# (observer widths, output keys, inputs, outputs) for every pulse, as numpy arrays. the inputs are the observers' raw
+# values whatever the teacher's topology, so a student (a plain Topology) can read them.
+def record_games(teacher, topology=None, games=20, engine=None):
+    if topology is None:
+        topology = Topology()
+
+    samples = []
+    widths, output_keys = None, None
+    for _ in range(games):
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        for us, them in ((p1, p2), (p2, p1)):
+            observers = match.observers_for(us)
+            nn = topology.build(observers, teacher, recording_engine(samples, engine, observers))
+            us.strategy = NeuralGinStrategy(us, them, match, nn)
+            widths, output_keys = [observer.width for observer in observers], nn.output_keys
+        match.run()
+
+    inputs = numpy.array([sample[0] for sample in samples], dtype=numpy.float64)
+    outputs = numpy.array([sample[1] for sample in samples], dtype=numpy.float64)
+    return widths, output_keys, inputs, outputs
+
+
+# fit a network of the student topology to reproduce outputs from inputs, returning its GeneSet. input neurons share
+# their weights the same way a NeuralNet's do: every observer reads weights['input'] from 0.
+def fit_student(widths, inputs, outputs, topology, epochs=300, rate=0.01, initial_input_weights=None):
+    from genetic_algorithm import GeneSet
+
+    assert numpy is not None, "distillation requires numpy"
+    assert len(topology.hidden) == 1, "students have a single hidden layer"
+    assert sum(widths) == inputs.shape[1], "observer widths don't match the recorded inputs"
+
+    sigmoid = activation.get_vector_sigmoid('exact')
+    keys = numpy.array([key for width in widths for key in range(width)])
+
+    # start from the champion's input weights when we have them, and small random weights elsewhere
+    geneset = GeneSet(topology.genome_length())
+    weightset = topology.weightset(geneset)
+    input_weights = weightset.matrix('input').copy()
+    if initial_input_weights is not None:
+        input_weights[:len(initial_input_weights)] = initial_input_weights
+    hidden = weightset.matrix('hidden') * 0.1
+    output = weightset.matrix('output') * 0.1
+    parameters = [input_weights, hidden, output]
+
+    # adam
+    moments = [numpy.zeros_like(parameter) for parameter in parameters]
+    velocities = [numpy.zeros_like(parameter) for parameter in parameters]
+    for epoch in range(1, epochs + 1):
+        # forward, with the bias neuron's +1 at each layer
+        activations = sigmoid(inputs * input_weights[keys])
+        hidden_out = sigmoid(activations.dot(hidden.T) + 1)
+        predicted = sigmoid(hidden_out.dot(output.T) + 1)
+
+        # backward, for the mean squared error
+        output_delta = (predicted - outputs) * predicted * (1 - predicted) / len(inputs)
+        hidden_delta = output_delta.dot(output) * hidden_out * (1 - hidden_out)
+        input_delta = hidden_delta.dot(hidden) * activations * (1 - activations) * inputs
+        gradients = [numpy.bincount(keys, weights=input_delta.sum(axis=0), minlength=len(input_weights)),
+                     hidden_delta.T.dot(activations), output_delta.T.dot(hidden_out)]
+
+        for i in range(len(parameters)):
+            moments[i] = 0.9 * moments[i] + 0.1 * gradients[i]
+            velocities[i] = 0.999 * velocities[i] + 0.001 * gradients[i] ** 2
+            moment = moments[i] / (1 - 0.9 ** epoch)
+            velocity = velocities[i] / (1 - 0.999 ** epoch)
+            parameters[i] -= rate * moment / (numpy.sqrt(velocity) + 1e-8)
+
+    # lay the weights out as genes, in the student topology's order
+    genes = numpy.concatenate([parameter.ravel() for parameter in parameters]).tolist()
+    return GeneSet(genes)
+
+
+# pulse a network of the given topology over each row of raw input values, returning a row of outputs for each
+def evaluate_genes(geneset, topology, widths, inputs, engine=None):
+    if engine is None:
+        engine = 'numpy'
+    weightset = topology.weightset(geneset)
+    input_weights = weightset.layer('input')
+    engine = ENGINES[engine](weightset, [input_weights[key] for width in widths for key in range(width)])
+    return [engine.evaluate(list(row)) for row in inputs]
+
+
+# the mean squared error of a network over recorded samples
+def student_error(geneset, topology, widths, inputs, outputs):
+    predicted = numpy.array(evaluate_genes(geneset, topology, widths, inputs))
+    return float(((predicted - outputs) ** 2).mean())
+
+
+# the fraction of decisions (one per output head) on which two sets of outputs agree
+def decision_agreement(output_keys, expected, actual):
+    decisions, agreed = 0, 0
+    for i in range(len(expected)):
+        expected_decisions = decode_decisions(dict(zip(output_keys, expected[i])))
+        actual_decisions = decode_decisions(dict(zip(output_keys, actual[i])))
+        decisions += len(expected_decisions)
+        agreed += len([j for j in range(len(expected_decisions)) if expected_decisions[j] == actual_decisions[j]])
+    return float(agreed) / max(1, decisions)
+
+
+# the whole pipeline: returns the student's GeneSet and a report of its decision agreement with the teacher (over
+# recorded pulses held out of training) and its speedup per pulse
+def distill(teacher, teacher_topology=None, student_topology=None, games=20, epochs=300, engine=None):
+    if teacher_topology is None:
+        teacher_topology = Topology()
+    if student_topology is None:
+        student_topology = Topology(hidden=[12])
+    if engine is None:
+        engine = 'numpy'
+
+    widths, output_keys, inputs, outputs = record_games(teacher, teacher_topology, games)
+
+    # hold every fifth pulse out of training, to measure agreement on
+    held_out = numpy.arange(len(inputs)) % 5 == 0
+
+    # a plain teacher's input weights are a good start for the student's, an encoder's weigh other inputs entirely
+    teacher_input_weights = None
+    if teacher_topology.spec()['kind'] == 'dense':
+        teacher_input_weights = teacher_topology.weightset(teacher).layer('input')[:max(widths)]
+    student = fit_student(widths, inputs[~held_out], outputs[~held_out], student_topology, epochs,
+                          initial_input_weights=teacher_input_weights)
+
+    predicted = evaluate_genes(student, student_topology, widths, inputs[held_out], engine)
+    agreement = decision_agreement(output_keys, outputs[held_out].tolist(), predicted)
+
+    observers, states = record_states(100)
+    teacher_time = time_pulses(teacher_topology.build(observers, teacher, engine), observers, states)
+    student_time = time_pulses(student_topology.build(observers, student, engine), observers, states)
+
+    report = {'teacher': teacher_topology.describe(), 'student': student_topology.describe(),
+              'samples': len(inputs), 'held_out': int(held_out.sum()), 'agreement': agreement,
+              'speedup': teacher_time / student_time}
+    return student, report
+
+
+# the distill report as a table
+def draw_distillation_report(report):
+    table = Texttable()
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.set_cols_dtype(['t', 't', 'i', 'i', 'f', 'f'])
+    table.add_rows([["teacher", "student", "pulses recorded", "pulses held out", "decision agreement", "speedup"],
+                    [report['teacher'], report['student'], report['samples'], report['held_out'],
+                     report['agreement'], report['speedup']]])
+    return table.draw()
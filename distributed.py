@@ -0,0 +1,248 @@
+#!/usr/bin/python
+#
+# distributed.py
+#
+# 2026/10/18
+# rg
+#
+# play a fitness test's matches on other hosts. a Population given a Coordinator publishes its pairings as work
+# units (challenger genes, defender genes, seed), and worker processes anywhere that can reach it over tcp pull them,
+# play the match and stream the outcome back. since every pairing plays under its own seed, and every worker builds
+# its networks with the engine the coordinator names, the results are the same as playing the matches in one process.
+# a worker that can't run that engine fails its units, so give the Population an engine every host has (e.g.
+# 'compiled') when some hosts lack numpy.
+#
+# each message is a line of json. a worker sends {"result": ...} with the outcome of its last unit (or {} to begin
+# with), and is answered with its next unit {"unit": ..., "config": ...} or, when there's none to hand out yet, with
+# {"idle": seconds} to ask again after. a unit handed out is leased to its worker: if the worker drops out, the lease
+# runs out before its result arrives, or the worker fails to play it (sending {"result": {..., "error": message}}),
+# the unit goes to the next worker to ask. whichever result comes in first is kept. a unit handed back more than
+# retries times fails the whole job.
+#
+# run a worker with: python distributed.py host:port
+
+from genetic_algorithm import *
+import SocketServer
+import json
+import socket
+import sys
+
+
+class CoordinatorHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        coordinator.connected(self.connection)
+        try:
+            for line in self.rfile:
+                reply = coordinator.exchange(self.connection, json.loads(line))
+                self.wfile.write(json.dumps(reply) + '\n')
+                self.wfile.flush()
+        except (socket.error, ValueError):
+            pass
+        finally:
+            coordinator.disconnected(self.connection)
+
+
+class Coordinator(object):
+    # host and port are where workers connect, by default any free port on this host only. pass host='0.0.0.0' to
+    # take workers from other hosts. lease is how many seconds a worker has to play a unit before it's handed out again,
+    # and retries how many times a unit is handed out again before we give up on the job.
+    def __init__(self, host=None, port=None, lease=None, idle=None, retries=None):
+        if host is None:
+            host = '127.0.0.1'
+        if port is None:
+            port = 0
+        if lease is None:
+            lease = 60.0
+        if idle is None:
+            idle = 0.05
+        if retries is None:
+            retries = 3
+        self.host = host
+        self.port = port
+        self.lease = lease
+        self.idle = idle
+        self.retries = retries
+
+        self.server = None
+        self.thread = None
+        self.condition = threading.Condition()
+        self.connections = set()
+
+        # the job being played: its number, the config workers build networks with, its units, the indices of the
+        # units waiting to be handed out, the {index: (connection, expiry)} leases out, the outcomes in, the
+        # {index: count} of times each unit was handed back and why the job failed, if it has
+        self.job = 0
+        self.config = None
+        self.units = []
+        self.waiting = []
+        self.leases = {}
+        self.outcomes = []
+        self.handed_back = {}
+        self.error = None
+
+        # tally of units handed out again after their worker dropped out or ran out of time
+        self.reassigned = 0
+
+    def start(self):
+        SocketServer.ThreadingTCPServer.allow_reuse_address = True
+        self.server = SocketServer.ThreadingTCPServer((self.host, self.port), CoordinatorHandler)
+        self.server.daemon_threads = True
+        self.server.coordinator = self
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    # stop taking workers and disconnect the ones we have, which ends their run_worker()
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        with self.condition:
+            for connection in list(self.connections):
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+
+    # the (host, port) workers connect to
+    def address(self):
+        return self.server.server_address
+
+    # hand out every unit and wait for all of their outcomes, returned in the units' order
+    def play(self, config, units):
+        with self.condition:
+            self.job += 1
+            self.config = config
+            self.units = units
+            self.waiting = range(len(units))
+            self.leases = {}
+            self.outcomes = [None] * len(units)
+            self.handed_back = {}
+            self.error = None
+
+            while None in self.outcomes and self.error is None:
+                self.condition.wait(min(self.lease, 0.5))
+                self.expire_leases()
+
+            self.units, self.waiting, self.leases = [], [], {}
+            assert self.error is None, "the job failed: " + str(self.error)
+            return self.outcomes
+
+    def expire_leases(self):
+        now = time.time()
+        for index, (connection, expiry) in self.leases.items():
+            if expiry < now:
+                self.reassign(index, "its lease ran out")
+
+    # hand a unit out again, unless it's been handed back too often already, in which case the job fails
+    def reassign(self, index, reason):
+        del self.leases[index]
+        self.handed_back[index] = self.handed_back.get(index, 0) + 1
+        if self.handed_back[index] > self.retries:
+            self.error = "unit {0} was handed back {1} times, last because {2}".format(
+                index, self.handed_back[index], reason)
+            self.condition.notify_all()
+            return
+        self.waiting.append(index)
+        self.reassigned += 1
+
+    def connected(self, connection):
+        with self.condition:
+            self.connections.add(connection)
+
+    # a worker dropped out: what it was leased goes back in line
+    def disconnected(self, connection):
+        with self.condition:
+            self.connections.discard(connection)
+            for index, (leaseholder, expiry) in self.leases.items():
+                if leaseholder is connection:
+                    self.reassign(index, "its worker dropped out")
+            self.condition.notify_all()
+
+    # take a worker's message, with the result of its last unit if it has one, and answer it with its next unit
+    def exchange(self, connection, message):
+        with self.condition:
+            result = message.get('result')
+            if result is not None and result['job'] == self.job and self.outcomes[result['index']] is None:
+                index = result['index']
+                if 'error' in result:
+                    if index in self.leases and self.leases[index][0] is connection:
+                        self.reassign(index, "its worker failed: " + str(result['error']))
+                else:
+                    self.outcomes[index] = result['outcome']
+                    self.leases.pop(index, None)
+                    if index in self.waiting:
+                        self.waiting.remove(index)
+                    self.condition.notify_all()
+
+            self.expire_leases()
+            if not self.waiting or self.error is not None:
+                return {'idle': self.idle}
+
+            index = self.waiting.pop(0)
+            self.leases[index] = (connection, time.time() + self.lease)
+            challenger_genes, defender_genes, seed = self.units[index]
+            return {'config': self.config,
+                    'unit': {'job': self.job, 'index': index, 'challenger': challenger_genes,
+                             'defender': defender_genes, 'seed': seed}}
+
+
+# pull units from the coordinator at address (host, port) and play them, until it goes away. returns the number of
+# units played.
+def run_worker(address):
+    connection = socket.create_connection(address)
+    reader = connection.makefile('rb')
+
+    job, population, genesets, networks, caches = None, None, None, None, None
+    played = 0
+    message = {}
+    while True:
+        try:
+            connection.sendall(json.dumps(message) + '\n')
+            line = reader.readline()
+        except socket.error:
+            break
+        if not line:
+            break
+
+        reply = json.loads(line)
+        message = {}
+        if 'unit' not in reply:
+            time.sleep(reply.get('idle', 0))
+            continue
+
+        # a new job's networks are built afresh, by a Population of none set up like the coordinator's. a unit we
+        # can't play (say, for an engine this host can't run) is sent back with the error, and we carry on.
+        unit = reply['unit']
+        try:
+            if unit['job'] != job:
+                config = reply['config']
+                job = None
+                population = Population(None, 0, engine=str(config['engine']),
+                                        topology=Topology.from_spec(config['topology']),
+                                        decision_cache=config['decision_cache'])
+                genesets, networks, caches = {}, {}, {}
+                job = unit['job']
+
+            for genes in (unit['challenger'], unit['defender']):
+                if tuple(genes) not in genesets:
+                    genesets[tuple(genes)] = GeneSet(genes)
+            outcome = population.play_pairing(genesets[tuple(unit['challenger'])],
+                                              genesets[tuple(unit['defender'])], unit['seed'], networks, caches)
+        except Exception as e:
+            log_warn("failed to play unit {0} of job {1}: {2}".format(unit['index'], unit['job'], e))
+            message = {'result': {'job': unit['job'], 'index': unit['index'], 'error': str(e)}}
+            continue
+
+        message = {'result': {'job': job, 'index': unit['index'], 'outcome': outcome}}
+        played += 1
+
+    reader.close()
+    connection.close()
+    return played
+
+
+if __name__ == '__main__':
+    host, port = sys.argv[1].rsplit(':', 1)
+    log_info("played {0} units".format(run_worker((host, int(port)))))
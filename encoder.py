@@ -0,0 +1,108 @@
+#!/usr/bin/python
+#
+# encoder.py
+#
+# 2026/10/18
+# rg
+#
+# a smaller network variant: rather than an input neuron (and a column of hidden weights) per card slot, one shared
+# card encoder turns each card into a few features, looked up in a table with a row per card value (much like a
+# convolution over the slots). the hand's cards and the table's older discards are pooled by summing their features,
+# while the top of the discard pile (the card that can be picked up) keeps its own. those, with the deck's height and
+# the match's 5 values, are what the input layer sees.
+#
+# with 4 features per card and a hidden layer of 12, a genome is 494 genes rather than 3129, and a pulse does about
+# a tenth of the multiplies. the encoder table's genes come after the usual layers.
+
+from topology import *
+import uuid
+
+
+# stands in for the hand, table and match Observers of a player, presenting their encoded and pooled values
+class CardEncoder(object):
+    card_values = 53                # card rankings run from 1 to 52, 0 being no card
+    observer_widths = [11, 33, 5]   # the hand, table and match
+
+    def __init__(self, observers, table):
+        assert [observer.width for observer in observers] == self.observer_widths, \
+            "a card encoder reads a hand, a table and a match observer"
+        self.observers = observers
+        self.table = table
+        self.encoding = len(table[0])
+        self.width = 3 * self.encoding + 1 + self.observer_widths[2]
+        self.id = uuid.uuid4()
+
+        # the observers' buffers our values were computed from
+        self.buffers = None
+        self.values = None
+
+    # the features of every card in the given slots, summed
+    def pool(self, buffer, slots):
+        pooled = [0.0] * self.encoding
+        for slot in slots:
+            value = buffer[slot]
+            if 0 <= value < self.card_values:
+                row = self.table[value]
+                for i in range(self.encoding):
+                    pooled[i] += row[i]
+        return pooled
+
+    # the table's slot 0 is the deck's height, then come the discards, oldest first
+    def encode(self):
+        hand, table, match = [observer.buffer for observer in self.observers]
+        discards = [slot for slot in range(1, 33) if table[slot]]
+        return self.pool(hand, range(11)) + self.pool(table, discards[-1:]) + self.pool(table, discards[:-1]) + \
+            [table[0]] + [match[i] for i in range(5)]
+
+    # observers replace their buffer when they're notified, so we only encode again once one of them has been
+    def get_value_by_index(self, index):
+        buffers = [observer.buffer for observer in self.observers]
+        if self.buffers is None or [a for a, b in zip(buffers, self.buffers) if a is not b]:
+            self.values = self.encode()
+            self.buffers = buffers
+        return self.values[index]
+
+    # the same encoder, reading another player's observers
+    def rebind(self, observers):
+        return CardEncoder(observers, self.table)
+
+
+# a Topology whose networks read a CardEncoder over the usual observers
+class EncoderTopology(Topology):
+    def __init__(self, encoding=None, hidden=None, outputs=None, activation_mode=None):
+        if encoding is None:
+            encoding = 4
+        if hidden is None:
+            hidden = [12]
+        self.encoding = encoding
+        super(EncoderTopology, self).__init__(3 * encoding + 1 + CardEncoder.observer_widths[2], hidden, outputs,
+                                              activation_mode)
+
+    def genome_length(self):
+        return super(EncoderTopology, self).genome_length() + CardEncoder.card_values * self.encoding
+
+    # the encoder table's rows, from the genes after the usual layers
+    def encoder_table(self, geneset):
+        table = []
+        offset = super(EncoderTopology, self).genome_length()
+        for value in range(CardEncoder.card_values):
+            start = offset + value * self.encoding
+            table.append([float(gene) for gene in geneset.genes[start:start + self.encoding]])
+        return table
+
+    def build(self, observers, geneset, engine=None):
+        encoder = CardEncoder(observers, self.encoder_table(geneset))
+        return super(EncoderTopology, self).build([encoder], geneset, engine)
+
+    def attach(self, nn, observers):
+        return self.in_mode(nn.attach, [nn.observers[0].rebind(observers)])
+
+    def describe(self):
+        return 'encoder-%d ' % self.encoding + super(EncoderTopology, self).describe()
+
+    def spec(self):
+        return {'kind': 'encoder', 'encoding': self.encoding, 'hidden': list(self.hidden), 'outputs': self.outputs,
+                'activation_mode': self.activation_mode}
+
+
+TOPOLOGIES['encoder'] = EncoderTopology
@@ -13,16 +13,30 @@ from utility import *
 from ginmatch import *
 from neuralnet import *
 from ginstrategy import *
+from batchinference import *
+from topology import *
+from distill import *
+from encoder import *
+from artifact import *
+from pairing import *
+from headtohead import *
+from array import array
+import multiprocessing
+import os
 import pickle
+import sys
+import time
 
 
+# the genes are an array of doubles. with numpy, creating, crossing and mutating them is done a whole genome at a time
+# from bulk random draws (seeded from the random module, so random.seed() still makes breeding repeatable), and
+# without it a gene at a time. pickled, the genes are a string of their bytes.
 class GeneSet(object):
     def __init__(self, genes=None):
         if isinstance(genes, int):
             # create genome of the requested size.
 #            # for the random seed values, we want to try to pick smart values.
 #            # let's make 2% of the weights significant and the rest small randoms
-            self.genes = []
             default_length = genes
 #            possible_means = [-2.0, -1.0, 0.0, 1.0, 2.0]
 #            shuffle(possible_means)
@@ -32,18 +46,19 @@ class GeneSet(object):
 
 #            [self.genes.append(abs(random.gauss(0, 1))) for _ in range(int(0.02 * default_length))]
 #            [self.genes.append(abs(random.gauss(mean, 0.25))) for _ in range(int(0.98 * default_length))]
-            [self.genes.append(random.gauss(mean, stdev)) for _ in range(default_length)]
+            if numpy is not None:
+                self.genes = GeneSet.to_array(GeneSet.random_state().normal(mean, stdev, default_length))
+            else:
+                self.genes = array('d', [random.gauss(mean, stdev) for _ in range(default_length)])
 #            shuffle(self.genes)
 
-            # make sure the integer rounding doesn't lose us a gene or two
-            for _ in range(genes - len(self.genes)):
-                self.genes.append(abs(random.gauss(mean, stdev)))
-
         elif isinstance(genes, list):
             # store genome, ensuring genes are valid
             for gene in genes:
                 assert isinstance(gene, float)
-                self.genes = genes
+            self.genes = array('d', genes)
+        elif isinstance(genes, array):
+            self.genes = genes
         else:
             raise AssertionError("strange value passed in")
 
@@ -51,18 +66,42 @@ class GeneSet(object):
     def make_geneset(*args, **kwargs):
         return GeneSet(*args, **kwargs)
 
+    # numpy's random numbers, seeded from the random module
+    @staticmethod
+    def random_state():
+        return numpy.random.RandomState(random.getrandbits(32))
+
+    # count random booleans, from one random bit each
+    @staticmethod
+    def random_bits(random_state, count):
+        bits = numpy.unpackbits(numpy.frombuffer(random_state.bytes((count + 7) // 8), dtype=numpy.uint8))
+        return bits[:count].astype(bool)
+
+    # a numpy array of doubles as an array of genes
+    @staticmethod
+    def to_array(values):
+        return array('d', numpy.asarray(values, dtype=numpy.float64).tostring())
+
     # cross the genes of two GeneSets (sexy times)
     def cross(self, partner):
-        # return a new GeneSet with length of longest genome
-        child = self.make_geneset(max(len(self.genes), len(partner.genes)))
-
-        # cross up to the length of the smallest partner's genome
+        # the child's genome is as long as the longest one's
         big_partner, small_partner = self, partner
         if len(self.genes) < len(partner.genes):
             big_partner, small_partner = partner, self
-
-        # do the cross
-        for i in range(len(small_partner.genes)):
+        crossed = len(small_partner.genes)
+
+        # each gene up to the length of the smallest partner's genome comes from either partner, the rest are new
+        if numpy is not None:
+            small_genes = numpy.frombuffer(small_partner.genes, dtype=numpy.float64)
+            big_genes = numpy.frombuffer(big_partner.genes, dtype=numpy.float64)[:crossed]
+            random_state = GeneSet.random_state()
+            from_big = GeneSet.random_bits(random_state, crossed)
+            genes = GeneSet.to_array(numpy.where(from_big, big_genes, small_genes))
+            genes.extend(GeneSet.to_array(random_state.normal(0, 1, len(big_partner.genes) - crossed)))
+            return self.make_geneset(genes)
+
+        child = self.make_geneset(len(big_partner.genes))
+        for i in range(crossed):
             if int(random.random() * 2) == 0:
                 child.genes[i] = small_partner.genes[i]
             else:
@@ -74,10 +113,48 @@ class GeneSet(object):
     def mutate(self, probability=None):
         if probability is None:
             probability = 0.001
+
+        if numpy is not None:
+            if probability <= 0 or len(self.genes) == 0:
+                return
+            # the gaps between mutated genes are geometric, so we draw about one number per mutation
+            random_state = GeneSet.random_state()
+            count = len(self.genes)
+            gaps = random_state.geometric(probability, int(count * probability * 1.2) + 16)
+            while gaps.sum() < count:
+                gaps = numpy.concatenate([gaps, random_state.geometric(probability, len(gaps))])
+            mutated = numpy.cumsum(gaps) - 1
+            mutated = mutated[mutated < count]
+
+            genes = numpy.frombuffer(self.genes, dtype=numpy.float64).copy()
+            genes[mutated] += random_state.normal(0, 0.5, len(mutated))
+            self.genes[:] = GeneSet.to_array(genes)
+            return
+
         for i in range(len(self.genes)):
             if random.random() > 1 - probability:
                 self.genes[i] += random.gauss(0, 0.5)
 
+    # the genes pickle as a string of little-endian doubles. GeneSets pickled with a list of genes load as well.
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        genes = array('d', self.genes)
+        if sys.byteorder != 'little':
+            genes.byteswap()
+        state['genes'] = genes.tostring()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self.genes, list):
+            self.genes = array('d', self.genes)
+        elif isinstance(self.genes, str):
+            genes = array('d')
+            genes.fromstring(self.genes)
+            if sys.byteorder != 'little':
+                genes.byteswap()
+            self.genes = genes
+
 
 class GinGeneSet(GeneSet):
     def __init__(self, genes=None):
@@ -88,11 +165,72 @@ class GinGeneSet(GeneSet):
         return GinGeneSet(*args, **kwargs)
 
 
+# a fitness test's worker process: the Population it was forked from, and the GeneSets, networks and decision caches it
+# has built, kept for the rest of the fitness test
+fitness_worker = {}
+
+
+def start_fitness_worker(population):
+    fitness_worker.update({'population': population, 'genesets': {}, 'networks': {}, 'caches': {}})
+
+
+# play a (challenger genes, defender genes, seed) work unit, returning the match's outcome
+def play_work_unit(unit):
+    challenger_genes, defender_genes, seed = unit
+    genesets = fitness_worker['genesets']
+    for genes in (challenger_genes, defender_genes):
+        if tuple(genes) not in genesets:
+            genesets[tuple(genes)] = GeneSet(list(genes))
+
+    return fitness_worker['population'].play_pairing(genesets[tuple(challenger_genes)],
+                                                     genesets[tuple(defender_genes)], seed,
+                                                     fitness_worker['networks'], fitness_worker['caches'])
+
+
 class Population(object):
-    def __init__(self, gene_size, population_size, retain_best=None, local_storage=None):
+    # engine is passed through to each GinNeuralNet, by default the fastest one on this machine. batched runs the
+    # fitness test's matches side by side, evaluating their pulses together (see batchinference.py). topology is the
+    # shape of every member's network (see topology.py), and a gene_size of None fits the genome to it exactly.
+    # decision_cache gives each member a DecisionCache for the generation, shared by all of its matches. processes
+    # above 1 plays the fitness test's matches in that many worker processes, and a coordinator (see distributed.py)
+    # has them played by workers on other hosts, either with the same results as playing them here. schedule picks who
+    # plays whom (see pairing.py), by default every member plays every other. a head_to_head store (see headtohead.py)
+    # remembers the matches each pair has played across generations, so that pairs only play the ones they still need.
+    def __init__(self, gene_size, population_size, retain_best=None, local_storage=None, engine=None, batched=False,
+                 topology=None, decision_cache=True, processes=None, coordinator=None, schedule=None,
+                 head_to_head=None):
         self.member_genes = {}
         self.current_generation = 0
 
+        if engine is None:
+            engine = 'auto'
+        self.engine = engine
+        self.batched = batched
+
+        if processes is None:
+            processes = 1
+        assert processes == 1 or not batched, "a batched fitness test runs in one process"
+        self.processes = processes
+        self.coordinator = coordinator
+
+        if schedule is None:
+            schedule = RoundRobinSchedule()
+        self.schedule = schedule
+        self.head_to_head = head_to_head
+
+        if topology is None:
+            topology = Topology()
+        self.topology = topology
+        if gene_size is None:
+            gene_size = topology.genome_length()
+
+        # what each topology we've run with has cost us, keyed by Topology.describe()
+        self.topology_costs = {}
+
+        # how the decision caches fared in the last fitness test: {'hits': ..., 'misses': ..., 'hit_rate': ...}
+        self.decision_cache = decision_cache
+        self.cache_stats = None
+
         if retain_best is None:
             # by default, keep at least 2 and at most best 10%
             self.retain_best = max(2, int(len(self.member_genes) * 0.10))
@@ -127,6 +265,28 @@ class Population(object):
         if self.local_storage and self.current_generation % 100 == 0:
             self.persist(action='store')
 
+    # the weights of the best member's network
+    def best_weightset(self):
+        return self.topology.weightset(self.get_top_members(1)[0])
+
+    # how pruning the best member's network would pay off at each threshold (see neuralengine.sparsity_report)
+    def sparsity_report(self, thresholds=None):
+        return draw_sparsity_report(sparsity_report(self.best_weightset(), thresholds))
+
+    # how the best member's network fares at reduced precision (see neuralengine.precision_report)
+    def precision_report(self):
+        return draw_precision_report(precision_report(self.best_weightset()))
+
+    # distill the best member's network into a smaller student (see distill.py), returning the student's GeneSet and
+    # a report of how closely and how much faster it plays
+    def distill_champion(self, student_topology=None, games=20):
+        student, report = distill(self.get_top_members(1)[0], self.topology, student_topology, games)
+        return student, draw_distillation_report(report)
+
+    # export the best member's network as a frozen artifact (see artifact.py), returning its size in bytes
+    def export_champion(self, path):
+        return export_artifact(self.get_top_members(1)[0], self.topology, path)
+
     # add a member with a given generation
     def add_member(self, geneset, generation):
         self.member_genes[geneset] = {'match_wins': 0, 'match_losses': 0, 'game_wins': 0, 'coinflip_game_wins': 0,
@@ -167,93 +327,251 @@ class Population(object):
         # over 100 games, vs an opponent who scores 25 points per game, how many points will we win (can be negative)
         return 100 * (winrate * points_per_win - (1 - winrate) * 25)
 
-    # engage each member in competition with each other member, recording the results
+    # engage the members in competition with each other, as paired by our schedule (by default, each with every other
+    # member), recording the results. each pairing's match is played under a seed of its own, so it plays out the same
+    # whether it's run here or in a worker process.
     def fitness_test(self):
+        started = time.time()
+
+        # pick the engine now, as benchmarking one draws random numbers of its own
+        if self.engine == 'auto':
+            select_engine(self.topology)
 
-        # keep track of matches
-        matches = []
-        player_geneset_dict = {}
-
-        already_tested = []
-        for challenger_geneset in self.member_genes:
-            for defender_geneset in self.member_genes:
-                if challenger_geneset is not defender_geneset:
-                    # do not test both A vs B AND B vs A. Just test them once.
-                    if (challenger_geneset, defender_geneset) in already_tested or (
-                        defender_geneset, challenger_geneset) in already_tested:
-                        continue
-                    already_tested.append((challenger_geneset, defender_geneset))
-
-                    # create physical representations for these gene_sets
-                    challenger_player = GinPlayer()
-                    defender_player = GinPlayer()
-
-                    # store these in a lookup table
-                    player_geneset_dict[str(challenger_player.id)] = challenger_geneset
-                    player_geneset_dict[str(defender_player.id)]   = defender_geneset
-
-                    log_debug("Testing: {0} vs {1}".format(challenger_geneset, defender_geneset))
-
-                    match = GinMatch(challenger_player, defender_player)
-                    num_inputs = 11 + 5 + 33
-                    num_outputs = 4
-                    num_hidden = int((num_inputs + num_outputs) * (2.0 / 3.0))
-
-                    challenger_weightset = WeightSet(challenger_geneset, num_inputs, num_hidden, num_outputs)
-                    defender_weightset = WeightSet(defender_geneset, num_inputs, num_hidden, num_outputs)
-
-                    challenger_observers = [Observer(challenger_player), Observer(match.table), Observer(match)]
-                    defender_observers   = [Observer(defender_player), Observer(match.table), Observer(match)]
-
-                    challenger_neuralnet = GinNeuralNet(challenger_observers, challenger_weightset)
-                    defender_neuralnet   = GinNeuralNet(defender_observers,   defender_weightset)
-
-                    challenger_strategy = NeuralGinStrategy(challenger_player, defender_player, match,
-                                                            challenger_neuralnet)
-                    defender_strategy = NeuralGinStrategy(defender_player, challenger_player, match,
-                                                          defender_neuralnet)
-
-                    challenger_player.strategy = challenger_strategy
-                    defender_player.strategy = defender_strategy
-
-                    # send the match to a worker and store a handle for later use
-                    matches.append(match)
-
-        # run matches and record output
-        for match in matches:
-            # run the match
-            match_result = match.run()
-
-            # update our records
-            winner                      = match_result['winner']
-            loser                       = match_result['loser']
-            winner_wins                 = match_result['winner_games_won']
-            winner_wins_by_coinflip     = match_result['winner_games_won_by_coinflip']
-            winner_losses               = match_result['winner_games_lost']
-            loser_wins                  = match_result['loser_games_won']
-            loser_wins_by_coinflip      = match_result['loser_games_won_by_coinflip']
-            loser_losses                = match_result['loser_games_lost']
-            winner_point_delta          = match_result['winner_point_delta']
-
-            # track match wins
-            winner_geneset = player_geneset_dict[str(winner.id)]
-            loser_geneset  = player_geneset_dict[str(loser.id)]
-
-            self.member_genes[winner_geneset]['game_points']  += winner_point_delta
-            self.member_genes[winner_geneset]['match_wins']   += 1
-            self.member_genes[loser_geneset]['match_losses']  += 1
-
-            # track game wins
-            self.member_genes[winner_geneset]['game_wins']    += winner_wins
-            self.member_genes[loser_geneset]['game_wins']     += loser_wins
-
-            # track coinflip wins
-            self.member_genes[winner_geneset]['coinflip_game_wins'] += winner_wins_by_coinflip
-            self.member_genes[loser_geneset]['coinflip_game_wins']  += loser_wins_by_coinflip
-
-            # track game losses
-            self.member_genes[winner_geneset]['game_losses'] += winner_losses
-            self.member_genes[loser_geneset]['game_losses']  += loser_losses
+        # each member's network is built once for the whole generation, then attached to each match's observers
+        networks = {}
+        caches = {}
+
+        # the decision caches' hits and misses in matches played in other processes, sent back with their outcomes
+        elsewhere = {'hits': 0, 'misses': 0}
+
+        batcher = None
+        if self.batched:
+            batcher = BatchedInference()
+
+        # worker processes are started once, and play every round's matches
+        pool = None
+        if self.coordinator is None and self.processes > 1:
+            pool = multiprocessing.Pool(self.processes, initializer=start_fitness_worker, initargs=(self,))
+        try:
+            match_count = self.play_rounds(networks, caches, batcher, pool, elsewhere)
+            if pool is not None:
+                pool.close()
+        except:
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.join()
+
+        self.record_cost(time.time() - started, match_count)
+        self.record_cache_stats(caches, elsewhere)
+
+    # play each round of the schedule's pairings, recording its results before the next round is drawn up. returns
+    # the number of matches played. the decision cache hits and misses of matches played in other processes are
+    # added to elsewhere.
+    def play_rounds(self, networks, caches, batcher=None, pool=None, elsewhere=None):
+        match_count = 0
+        for pairings in self.schedule.rounds(self):
+            if self.head_to_head is not None:
+                pairings = self.head_to_head.needed(pairings)
+            outcomes = self.play_round(pairings, networks, caches, batcher, pool)
+            if elsewhere is not None and (pool is not None or self.coordinator is not None):
+                for outcome in outcomes:
+                    elsewhere['hits'] += outcome['cache_hits']
+                    elsewhere['misses'] += outcome['cache_misses']
+            for i in range(len(pairings)):
+                self.record_match_result(outcomes[i], pairings[i])
+                if self.head_to_head is not None:
+                    self.head_to_head.record(pairings[i], outcomes[i])
+            match_count += len(pairings)
+        return match_count
+
+    # play a round of pairings, returning their outcomes in the same order
+    def play_round(self, pairings, networks, caches, batcher=None, pool=None):
+        seeds = [random.getrandbits(32) for _ in pairings]
+
+        if self.coordinator is not None:
+            return self.coordinator.play(self.work_config(), self.work_units(pairings, seeds))
+        elif pool is not None:
+            return self.play_in_processes(pool, pairings, seeds)
+        elif batcher is not None:
+            # the batch interleaves its matches, so their seeds can't pin them down
+            matches = [self.build_match(challenger_geneset, defender_geneset, networks, caches, batcher)
+                       for challenger_geneset, defender_geneset in pairings]
+            return [self.match_outcome(matches[i], result) for i, result in enumerate(batcher.run(matches))]
+
+        # leave the random state as the worker processes would: only the seeds drawn from it
+        state = random.getstate()
+        try:
+            return [self.play_pairing(pairings[i][0], pairings[i][1], seeds[i], networks, caches)
+                    for i in range(len(pairings))]
+        finally:
+            random.setstate(state)
+
+    # a match between two GeneSets, each player's strategy playing its GeneSet's network
+    def build_match(self, challenger_geneset, defender_geneset, networks, caches, batcher=None):
+        # create physical representations for these gene_sets
+        challenger_player = GinPlayer()
+        defender_player = GinPlayer()
+
+        log_debug("Testing: {0} vs {1}".format(challenger_geneset, defender_geneset))
+
+        match = GinMatch(challenger_player, defender_player)
+
+        challenger_observers = match.observers_for(challenger_player)
+        defender_observers   = match.observers_for(defender_player)
+
+        challenger_neuralnet = self.network_for(challenger_geneset, challenger_observers, networks, batcher)
+        defender_neuralnet   = self.network_for(defender_geneset,   defender_observers,   networks, batcher)
+
+        challenger_cache = self.cache_for(challenger_geneset, caches)
+        defender_cache   = self.cache_for(defender_geneset,   caches)
+
+        challenger_player.strategy = NeuralGinStrategy(challenger_player, defender_player, match,
+                                                       challenger_neuralnet, challenger_cache)
+        defender_player.strategy = NeuralGinStrategy(defender_player, challenger_player, match,
+                                                     defender_neuralnet, defender_cache)
+        return match
+
+    # a match's result, with its winner and loser given as 0 (the challenger) or 1 (the defender) rather than as
+    # players, so it can be sent back from a worker process
+    @staticmethod
+    def match_outcome(match, match_result):
+        outcome = dict(match_result)
+        outcome['winner'] = 0 if match_result['winner'] is match.p1 else 1
+        outcome['loser'] = 0 if match_result['loser'] is match.p1 else 1
+        return outcome
+
+    # play the match between two GeneSets under the given seed, returning its outcome. the outcome also carries the
+    # hits and misses its players' decision caches had over the match.
+    def play_pairing(self, challenger_geneset, defender_geneset, seed, networks, caches):
+        random.seed(seed)
+        match = self.build_match(challenger_geneset, defender_geneset, networks, caches)
+        used = [caches[geneset] for geneset in set([challenger_geneset, defender_geneset]) if geneset in caches]
+        hits, misses = sum([cache.hits for cache in used]), sum([cache.misses for cache in used])
+
+        outcome = self.match_outcome(match, match.run())
+        outcome['cache_hits'] = sum([cache.hits for cache in used]) - hits
+        outcome['cache_misses'] = sum([cache.misses for cache in used]) - misses
+        return outcome
+
+    # a (challenger genes, defender genes, seed) work unit for each pairing
+    @staticmethod
+    def work_units(pairings, seeds):
+        return [(list(pairings[i][0].genes), list(pairings[i][1].genes), seeds[i]) for i in range(len(pairings))]
+
+    # what a worker on another host needs to build our networks: the topology's spec, an engine by name and whether
+    # decisions are cached. 'auto' is picked here, so every host computes with the same engine and their results
+    # agree even on close decisions. a host that can't run it sends its units back (see distributed.py).
+    def work_config(self):
+        engine = self.engine
+        if engine == 'auto':
+            engine = select_engine(self.topology)
+        assert isinstance(engine, basestring), "workers on other hosts need an engine by name"
+        return {'topology': self.topology.spec(), 'engine': engine, 'decision_cache': self.decision_cache}
+
+    # play each pairing in a pool of worker processes (started by fitness_test() with start_fitness_worker), sent as
+    # work units. the outcomes come back in the pairings' order. each worker builds its own networks, forked from
+    # this Population.
+    def play_in_processes(self, pool, pairings, seeds):
+        units = self.work_units(pairings, seeds)
+        return pool.map(play_work_unit, units, chunksize=max(1, len(units) // (4 * self.processes)))
+
+    # a GinNeuralNet for the given GeneSet reading from the given observers. the first call per GeneSet builds the
+    # network and keeps it in networks, later calls attach that one to their observers instead of building another.
+    def network_for(self, geneset, observers, networks, batcher=None):
+        if geneset in networks:
+            return self.topology.attach(networks[geneset], observers)
+
+        engine = self.engine
+        if batcher is not None:
+            engine = batcher.engine_for(geneset)
+
+        networks[geneset] = self.topology.build(observers, geneset, engine)
+        return networks[geneset]
+
+    # the DecisionCache for the given GeneSet's strategies this generation, if we're caching decisions
+    def cache_for(self, geneset, caches):
+        if not self.decision_cache:
+            return None
+        if geneset not in caches:
+            caches[geneset] = DecisionCache()
+        return caches[geneset]
+
+    # tally up the decision caches' hits and misses over a fitness test, with those of matches played elsewhere
+    def record_cache_stats(self, caches, elsewhere=None):
+        if elsewhere is None:
+            elsewhere = {'hits': 0, 'misses': 0}
+        if not caches and not elsewhere['hits'] + elsewhere['misses']:
+            return
+        hits = sum([cache.hits for cache in caches.values()]) + elsewhere['hits']
+        misses = sum([cache.misses for cache in caches.values()]) + elsewhere['misses']
+        self.cache_stats = {'hits': hits, 'misses': misses, 'hit_rate': float(hits) / max(1, hits + misses)}
+        log_info("decision cache hit rate: {0:.3f} ({1} of {2} decisions)".format(
+            self.cache_stats['hit_rate'], hits, hits + misses))
+
+    # note the time a fitness test took against our topology, measuring its cost per pulse the first time it's seen
+    def record_cost(self, seconds, match_count):
+        key = self.topology.describe()
+        if key not in self.topology_costs:
+            engine = self.engine
+            if self.batched:
+                engine = 'numpy'
+            self.topology_costs[key] = {'genome_length': self.topology.genome_length(),
+                                        'seconds_per_pulse': self.topology.measure_cost(engine),
+                                        'generations': 0, 'matches': 0, 'seconds': 0.0}
+
+        costs = self.topology_costs[key]
+        costs['generations'] += 1
+        costs['matches'] += match_count
+        costs['seconds'] += seconds
+
+    # what each topology we've run with has cost, to trade network size against generations per hour
+    def draw_costs(self):
+        table = Texttable(max_width=115)
+        table.set_deco(Texttable.HEADER | Texttable.BORDER)
+        table.set_cols_dtype(['t', 'i', 'e', 'i', 'f', 'f'])
+        rows = [["topology", "genome length", "seconds per pulse", "generations", "seconds per generation",
+                 "generations per hour"]]
+        for key in sorted(self.topology_costs):
+            costs = self.topology_costs[key]
+            per_generation = costs['seconds'] / max(1, costs['generations'])
+            rows.append([key, costs['genome_length'], costs['seconds_per_pulse'], costs['generations'],
+                         per_generation, 3600 / max(per_generation, 1e-9)])
+        table.add_rows(rows)
+        return table.draw()
+
+    # credit a match's outcome (see match_outcome) to the pair of GeneSets that played it
+    def record_match_result(self, match_result, pairing):
+        # update our records
+        winner_wins                 = match_result['winner_games_won']
+        winner_wins_by_coinflip     = match_result['winner_games_won_by_coinflip']
+        winner_losses               = match_result['winner_games_lost']
+        loser_wins                  = match_result['loser_games_won']
+        loser_wins_by_coinflip      = match_result['loser_games_won_by_coinflip']
+        loser_losses                = match_result['loser_games_lost']
+        winner_point_delta          = match_result['winner_point_delta']
+
+        # track match wins
+        winner_geneset = pairing[match_result['winner']]
+        loser_geneset  = pairing[match_result['loser']]
+
+        self.member_genes[winner_geneset]['game_points']  += winner_point_delta
+        self.member_genes[winner_geneset]['match_wins']   += 1
+        self.member_genes[loser_geneset]['match_losses']  += 1
+
+        # track game wins
+        self.member_genes[winner_geneset]['game_wins']    += winner_wins
+        self.member_genes[loser_geneset]['game_wins']     += loser_wins
+
+        # track coinflip wins
+        self.member_genes[winner_geneset]['coinflip_game_wins'] += winner_wins_by_coinflip
+        self.member_genes[loser_geneset]['coinflip_game_wins']  += loser_wins_by_coinflip
+
+        # track game losses
+        self.member_genes[winner_geneset]['game_losses'] += winner_losses
+        self.member_genes[loser_geneset]['game_losses']  += loser_losses
 
     # remove members from prior generations, sparing the top N specimens
     def cull(self):
@@ -265,6 +583,9 @@ class Population(object):
             if key not in survivor_list:
                 del self.member_genes[key]
 
+        if self.head_to_head is not None:
+            self.head_to_head.retain(self.member_genes.keys())
+
     # breed the top N individuals against each other, sexually (no asexual reproduction)
     def cross_over(self, breeder_count):
         breeders = self.get_top_members(breeder_count)
@@ -369,6 +690,12 @@ class Population(object):
 
         return output_text
 
+    # a coordinator's sockets and threads belong to this process, so it isn't stored with us
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('coordinator', None)
+        return state
+
     def persist(self, action=None):
         assert action is not None, "must specify an action when calling persist()"
         # by default, do not persist
@@ -376,17 +703,24 @@ class Population(object):
             return False
 
         if action == 'store':
+            # written alongside and renamed into place, so a store that fails leaves the last one intact
             try:
-                pickle.dump(self, open(self.local_storage, 'w'))
+                with open(self.local_storage + '.tmp', 'wb') as f:
+                    pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+                os.rename(self.local_storage + '.tmp', self.local_storage)
                 return True
             except:
+                if os.path.exists(self.local_storage + '.tmp'):
+                    os.remove(self.local_storage + '.tmp')
                 return False
         elif action == 'load':
             try:
                 # we make a new copy of the object, then we copy its __dict__ into our own __dict__
-                restored = pickle.load(open(self.local_storage, 'r'))
+                restored = pickle.load(open(self.local_storage, 'rb'))
                 for key in self.__dict__:
-                    self.__dict__[key] = restored.__dict__[key]
+                    # populations stored before a setting existed keep our value for it
+                    if key in restored.__dict__:
+                        self.__dict__[key] = restored.__dict__[key]
                 return True
             except:
                 return False
\ No newline at end of file
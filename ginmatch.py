@@ -75,6 +75,9 @@ class GinMatch(Observable):
         # we have 5 interesting points to offer observers
         self.observable_width = 5
 
+        # the table and match Observers both players' networks read from (see observers_for)
+        self.shared_observers = None
+
         # initial update for listeners
         self.noop_notify()
 
@@ -176,6 +179,13 @@ class GinMatch(Observable):
     def notify_of_knock_gin(self, knocker):
         self.player_who_knocked_gin = knocker
 
+    # the Observers a player's network reads: its own hand's, and the table's and match's, which are shared by both
+    # players so each change to them is organized and stored once
+    def observers_for(self, player):
+        if self.shared_observers is None:
+            self.shared_observers = [Observer(self.table), Observer(self)]
+        return [Observer(player)] + self.shared_observers
+
     # implement the Observable criteria. return a list of ints representing our game state
     def organize_data(self):
         return {0: self.knocking_point,
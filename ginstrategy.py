@@ -13,6 +13,7 @@
 # - list of actions taken thus far in the current game
 
 import math
+from pylru import lrucache
 
 
 class GinStrategy(object):
@@ -26,9 +27,50 @@ class GinStrategy(object):
         pass
 
 
+# a bounded cache of the decisions a network has made, keyed by a hash of its full input vector and the decision's
+# phase. a network decides the same way every time it sees the same inputs, so a hit saves a pulse. each decision is
+# kept with the state it was made in, so two states whose hashes collide don't share a decision.
+class DecisionCache(object):
+    def __init__(self, size=None):
+        if size is None:
+            size = 4096
+        self.decisions = lrucache(size)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(state):
+        return hash(state)
+
+    # the cached decision for the given inputs and phase, or None
+    def lookup(self, inputs, phase):
+        state = (phase, tuple(inputs))
+        try:
+            stored_state, decision = self.decisions[DecisionCache.make_key(state)]
+        except KeyError:
+            stored_state = None
+        if stored_state != state:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decision
+
+    def store(self, inputs, phase, decision):
+        state = (phase, tuple(inputs))
+        self.decisions[DecisionCache.make_key(state)] = (state, decision)
+
+    def hit_rate(self):
+        return float(self.hits) / max(1, self.hits + self.misses)
+
+
 class NeuralGinStrategy(GinStrategy):
-    def __init__(self, us, opponent, ginmatch, neural_net):
+    actions = {'start': ['PICKUP-FROM-DISCARD', 'DRAW'],
+               'end':   ['KNOCK', 'DISCARD', 'KNOCK-GIN']}
+
+    # a DecisionCache is best shared between every strategy playing the same network
+    def __init__(self, us, opponent, ginmatch, neural_net, cache=None):
         super(NeuralGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.cache = cache
 
         # ensure we have a neural net with our expected outputs
         self.nn = neural_net
@@ -36,12 +78,28 @@ class NeuralGinStrategy(GinStrategy):
         for output in required_outputs:
             assert output in self.nn.outputs.keys(), "we require a neural net with an '" + output + "' output neuron"
 
+    # only the output neurons a decision reads are pulsed
     def consider_accepting_improper_knock(self):
-        self.nn.pulse()
+        return self.decide('accept_improper_knock', self.decide_accepting_improper_knock)
+
+    def decide_accepting_improper_knock(self):
+        self.nn.pulse(['accept_improper_knock'])
         possibilities = [False, True]
         index = NeuralGinStrategy.decode_signal(self.nn.outputs['accept_improper_knock'], len(possibilities))
         return possibilities[index]
 
+    # make a decision with the given function, unless our cache has it
+    def decide(self, phase, decision_function):
+        if self.cache is None:
+            return decision_function()
+
+        inputs = self.nn.gather_inputs()
+        decision = self.cache.lookup(inputs, phase)
+        if decision is None:
+            decision = decision_function()
+            self.cache.store(inputs, phase, decision)
+        return decision
+
     # split a given a signal in [0, 1] into n buckets, returning the index of the bucket (starting at 0)
     @staticmethod
     def decode_signal(signal, buckets):
@@ -53,15 +111,20 @@ class NeuralGinStrategy(GinStrategy):
     # step function for the action output neuron
     def decode_action(self, phase=None):
         assert phase is not None, "a phase of 'start' or 'end' is required"
-        if phase == 'start':
-            actions = ['PICKUP-FROM-DISCARD', 'DRAW']
-            idx = NeuralGinStrategy.decode_signal(self.nn.outputs['action_start'], len(actions))
-        else:
-            actions = ['KNOCK', 'DISCARD', 'KNOCK-GIN']
-            idx = NeuralGinStrategy.decode_signal(self.nn.outputs['action_end'], len(actions))
-
+        actions = NeuralGinStrategy.actions[phase]
+        idx = NeuralGinStrategy.decode_signal(self.nn.outputs['action_' + phase], len(actions))
         return actions[idx]
 
+    # the decision a set of output values {key: value} makes for a phase: (action, index) for 'start' or 'end',
+    # True or False for 'accept_improper_knock'. only the phase's own output keys are read.
+    @staticmethod
+    def decode_decision(outputs, phase):
+        if phase == 'accept_improper_knock':
+            return [False, True][NeuralGinStrategy.decode_signal(outputs['accept_improper_knock'], 2)]
+        actions = NeuralGinStrategy.actions[phase]
+        return (actions[NeuralGinStrategy.decode_signal(outputs['action_' + phase], len(actions))],
+                NeuralGinStrategy.decode_signal(outputs['index'], 11))
+
     # step function for the index output neuron
     def decode_index(self):
         return NeuralGinStrategy.decode_signal(self.nn.outputs['index'], 11)
@@ -69,7 +132,10 @@ class NeuralGinStrategy(GinStrategy):
     # return our best action to an external caller
     def determine_best_action(self, phase=None):
         assert phase is not None, "a phase of 'start' or 'end' is required"
-        self.nn.pulse()
+        return list(self.decide(phase, lambda: self.decide_best_action(phase)))
+
+    def decide_best_action(self, phase):
+        self.nn.pulse(['action_' + phase, 'index'])
         action = self.decode_action(phase)
         index  = self.decode_index()
-        return [action, index]
\ No newline at end of file
+        return action, index
\ No newline at end of file
@@ -59,15 +59,13 @@ class GinTable(Observable):
         # we start with the current height of the drawing deck
         data = {0: len(self.deck.cards)}
 
-        # we now add on the discard pile
-        for i in range(len(self.discard_pile)):
-            data[i] = self.discard_pile[i].ranking()
+        # we now add on the discard pile, oldest first, so the card on top is in the last non-zero slot
+        discard_size = len(self.discard_pile)
+        for i in range(discard_size):
+            data[i+1] = self.discard_pile[i].ranking()
 
         # we then add 0's up to 32 possible discards -- 32 = 52 - 10(cards per hand) X 2(hands)
-        discard_size = len(self.discard_pile)
-        for i in range(1, discard_size):
-            data[i] = self.discard_pile[i-1].ranking()
-        for i in range(discard_size, 1+32):
+        for i in range(discard_size+1, 1+32):
             data[i] = 0
 
         return data
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+#
+# headtohead.py
+#
+# 2026/10/18
+# rg
+#
+# a store of head-to-head results that outlives a generation. members that survive a cull keep their stats, so
+# replaying them against each other every generation mostly re-measures what we know. the store remembers how many
+# matches each pair of genomes has played (and who won them), keyed by a fingerprint of each genome's genes, and a
+# Population given one only plays the matches a pair still needs to reach the target.
+
+from array import array
+import hashlib
+
+
+class HeadToHead(object):
+    # target is the number of matches each pair should have played
+    def __init__(self, target=None):
+        if target is None:
+            target = 1
+        assert target > 0, "pairs must play at least one match"
+        self.target = target
+
+        # {(fingerprint, fingerprint): {'matches': ..., 'wins': {fingerprint: ...}}}, each key in sorted order
+        self.records = {}
+
+        # each member's fingerprint, worked out once. a member's genes don't change once it's in the population.
+        self.fingerprints = {}
+
+        # tally of the matches we didn't need to play
+        self.skipped = 0
+
+    def fingerprint(self, geneset):
+        if geneset not in self.fingerprints:
+            genes = array('d', [float(gene) for gene in geneset.genes])
+            self.fingerprints[geneset] = hashlib.sha1(genes.tostring()).hexdigest()[:16]
+        return self.fingerprints[geneset]
+
+    def key(self, pairing):
+        return tuple(sorted([self.fingerprint(pairing[0]), self.fingerprint(pairing[1])]))
+
+    # the number of matches the pair has played
+    def matches(self, pairing):
+        record = self.records.get(self.key(pairing))
+        if record is None:
+            return 0
+        return record['matches']
+
+    # each pairing once for every match it needs to reach the target
+    def needed(self, pairings):
+        needed = []
+        for pairing in pairings:
+            played = self.matches(pairing)
+            needed += [pairing] * max(0, self.target - played)
+            self.skipped += min(played, self.target)
+        return needed
+
+    # remember a match's outcome (see Population.match_outcome)
+    def record(self, pairing, outcome):
+        key = self.key(pairing)
+        if key not in self.records:
+            self.records[key] = {'matches': 0, 'wins': {}}
+        record = self.records[key]
+        winner = self.fingerprint(pairing[outcome['winner']])
+        record['matches'] += 1
+        record['wins'][winner] = record['wins'].get(winner, 0) + 1
+
+    # forget everything about genomes other than the given members'
+    def retain(self, genesets):
+        self.fingerprints = dict([(geneset, self.fingerprint(geneset)) for geneset in genesets])
+        kept = set(self.fingerprints.values())
+        self.records = dict([(key, record) for key, record in self.records.items()
+                             if key[0] in kept and key[1] in kept])
@@ -0,0 +1,257 @@
+#!/usr/bin/python
+#
+# inferenceserver.py
+#
+# 2026/10/18
+# rg
+#
+# a local inference service: one process loads frozen networks (see artifact.py) and answers "best action for this
+# state" requests over a unix domain socket, so several simulator processes can share one warm copy of the champions
+# rather than each building its own GinNeuralNet.
+#
+# requests that arrive together are merged into one batched forward pass per network (see batchinference.py). the
+# first request of a batch waits at most max_wait seconds for company, which bounds what batching costs in latency.
+#
+# each message is a line of json. a request is {"network": name, "phase": phase, "state": [values, ...]}, the state
+# being each of the player's Observers' values (hand, table, match) as a list. the reply is {"decision": decision},
+# as NeuralGinStrategy.decode_decision() gives it, or {"error": message}.
+
+from artifact import *
+from batchinference import *
+from Queue import Queue, Empty
+import os
+import socket
+import time
+
+
+# stands in for an Observer in the server's networks, holding the values of a request's state
+class StateObserver(object):
+    def __init__(self, width):
+        self.width = width
+        self.buffer = [0] * width
+        self.id = uuid.uuid4()
+
+    def get_value_by_index(self, index):
+        return self.buffer[index]
+
+
+# a network being served: a GinNeuralNet over StateObservers, which turns states into its input values, and the
+# batcher its pulses are evaluated by
+class ServedNetwork(object):
+    def __init__(self, artifact, observer_widths):
+        self.observers = [StateObserver(width) for width in observer_widths]
+        if numpy is not None:
+            self.batcher = BatchedInference()
+            self.nn = artifact.build(self.observers, self.batcher.engine_for(artifact))
+        else:
+            self.batcher = None
+            self.nn = artifact.build(self.observers, 'compiled')
+
+    def check(self, state):
+        assert isinstance(state, list) and len(state) == len(self.observers), \
+            "a state has one list of values per observer"
+        for observer, values in zip(self.observers, state):
+            assert isinstance(values, list) and len(values) == observer.width, \
+                "a state's values don't match its observer's width"
+            assert not [value for value in values if not isinstance(value, (int, long))], \
+                "a state's values are integers"
+
+    def gather_inputs(self, state):
+        for observer, values in zip(self.observers, state):
+            observer.buffer = values
+        return self.nn.gather_inputs()
+
+    # the decision for each (phase, state) pair
+    def decide(self, requests):
+        inputs = [self.gather_inputs(state) for phase, state in requests]
+        if self.batcher is not None:
+            outputs = self.batcher.evaluate_batch([0] * len(inputs), inputs).tolist()
+        else:
+            outputs = [self.nn.engine.evaluate(values) for values in inputs]
+
+        decisions = []
+        for i in range(len(requests)):
+            values = dict(zip(self.nn.output_keys, outputs[i]))
+            decisions.append(NeuralGinStrategy.decode_decision(values, requests[i][0]))
+        return decisions
+
+
+class InferenceServer(object):
+    # max_wait is in seconds, max_batch the most requests evaluated in one pass
+    def __init__(self, path, max_wait=None, max_batch=None):
+        if max_wait is None:
+            max_wait = 0.002
+        if max_batch is None:
+            max_batch = 256
+        self.path = path
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+
+        self.networks = {}
+        self.requests = Queue()
+        self.listener = None
+        self.threads = []
+        self.running = False
+
+        # tally of how much batching we got
+        self.batches = 0
+        self.served = 0
+
+    # serve an artifact (or the path of one) under the given name
+    def load(self, name, artifact, observer_widths=None):
+        if isinstance(artifact, basestring):
+            artifact = load_artifact(artifact)
+        if observer_widths is None:
+            observer_widths = CardEncoder.observer_widths
+        self.networks[name] = ServedNetwork(artifact, observer_widths)
+
+    # listen on our socket and answer requests from background threads, until stop()
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(64)
+        self.running = True
+
+        for target in (self.accept, self.serve):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.running = False
+        self.listener.shutdown(socket.SHUT_RDWR)
+        self.listener.close()
+        os.unlink(self.path)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def accept(self):
+        while self.running:
+            try:
+                connection, _ = self.listener.accept()
+            except socket.error:
+                break
+            thread = threading.Thread(target=self.read, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    # queue each request a client sends, with the connection to reply on. only serve() replies, so replies to a
+    # connection never interleave.
+    def read(self, connection):
+        for line in connection.makefile('rb'):
+            self.requests.put((connection, line))
+        connection.close()
+
+    # take requests off the queue in batches: the first waits up to max_wait for others to join it
+    def serve(self):
+        while self.running:
+            try:
+                batch = [self.requests.get(timeout=0.1)]
+            except Empty:
+                continue
+
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except Empty:
+                    break
+
+            self.answer(batch)
+
+    # one forward pass per network in the batch, then a reply to every request
+    def answer(self, batch):
+        replies = [None] * len(batch)
+        by_network = {}
+        for i in range(len(batch)):
+            try:
+                request = json.loads(batch[i][1])
+                assert isinstance(request, dict), "a request is a json object"
+                assert request.get('network') in self.networks, "unknown network: " + str(request.get('network'))
+                assert request.get('phase') in GinNeuralNet.decision_heads, "unknown phase: " + \
+                    str(request.get('phase'))
+                self.networks[request['network']].check(request.get('state'))
+                by_network.setdefault(request['network'], []).append((i, request['phase'], request['state']))
+            except (ValueError, AssertionError) as e:
+                replies[i] = {'error': str(e)}
+
+        # a network that fails on its requests refuses them, rather than taking the server down with it
+        for name, requests in by_network.items():
+            try:
+                decisions = self.networks[name].decide([(phase, state) for i, phase, state in requests])
+            except Exception as e:
+                for i, phase, state in requests:
+                    replies[i] = {'error': "network {0} failed: {1}".format(name, e)}
+                continue
+            for j in range(len(requests)):
+                replies[requests[j][0]] = {'decision': decisions[j]}
+
+        self.batches += 1
+        self.served += len(batch)
+        for i in range(len(batch)):
+            try:
+                batch[i][0].sendall(json.dumps(replies[i]) + '\n')
+            except socket.error:
+                pass
+
+
+# a connection to an InferenceServer. each client waits for its own replies, so give each thread its own.
+class InferenceClient(object):
+    def __init__(self, path):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.reader = self.socket.makefile('rb')
+
+    # the decision the named network makes for a phase, given each observer's values
+    def decide(self, network, phase, state):
+        self.socket.sendall(json.dumps({'network': network, 'phase': phase, 'state': state}) + '\n')
+        line = self.reader.readline()
+        assert line, "the inference server closed the connection"
+        reply = json.loads(line)
+        assert 'error' not in reply, "the inference server refused a request: " + str(reply.get('error'))
+        return reply['decision']
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+
+# plays like a NeuralGinStrategy, asking an InferenceServer for its decisions rather than pulsing a network itself
+class RemoteGinStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch, client, network):
+        super(RemoteGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.client = client
+        self.network = network
+        self.observers = ginmatch.observers_for(us)
+
+    # each observer's current values, as the server expects them
+    def state(self):
+        return [[observer.get_value_by_index(i) for i in range(observer.width)] for observer in self.observers]
+
+    def consider_accepting_improper_knock(self):
+        return self.client.decide(self.network, 'accept_improper_knock', self.state())
+
+    def determine_best_action(self, phase=None):
+        assert phase is not None, "a phase of 'start' or 'end' is required"
+        return self.client.decide(self.network, phase, self.state())
+
+
+# serve artifacts until interrupted, e.g.: inferenceserver.py /tmp/gin.sock champion=champion.gin
+if __name__ == '__main__':
+    server = InferenceServer(sys.argv[1])
+    for argument in sys.argv[2:]:
+        name, path = argument.split('=', 1)
+        server.load(name, path)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,253 @@
+#!/usr/bin/python
+#
+# instrument.py
+#
+# 2026/10/18
+# rg
+#
+# optional instrumentation of where a generation's time goes. enable() patches counters and timers into
+# NeuralNet.pulse, Perceptron.generate_output, the hand analysis in ginhand.py and Population.fitness_test, and
+# disable() puts the originals back. nothing is patched until then, so when it's off it costs nothing at all.
+#
+# per network (networks sharing a WeightSet count as one) we count pulses, the seconds spent in each layer, the hits
+# and misses of the Perceptrons' memos and the sigmoids computed. a graph network's time is split by layer, each
+# Perceptron being charged its own time without that of the ones it pulls from. an engine computes its layers in one
+# go, so its time is all 'engine' and its sigmoids are one per neuron computed. each fitness test closes a
+# generation, summing its networks with the time spent analysing hands.
+#
+# only this process is patched, so a fitness test whose matches are played elsewhere (processes above 1, or a
+# coordinator) is refused while instrumenting: its report would show a generation with next to no inference in it.
+
+from genetic_algorithm import *
+from timeit import default_timer
+
+
+# the hand analysis timed, by class
+HAND_METHODS = {GinCardGroup: ['points', 'deadwood_count', 'deadwood_cards', 'enumerate_all_melds_and_sets',
+                               'enumerate_all_melds', 'enumerate_all_sets'],
+                GinHand: ['process_layoff']}
+
+
+class NetworkStats(object):
+    def __init__(self, nn):
+        self.pulses = 0
+        self.seconds = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.sigmoid_calls = 0
+
+        # an engine squashes every input and hidden neuron each pulse, plus the output neurons asked for
+        names = nn.weightset.names()
+        self.engine_sigmoids = sum([observer.width for observer in nn.observers]) + \
+            sum([nn.weightset.shape(name)[0] for name in names[1:-1]])
+
+    def add_seconds(self, layer, seconds):
+        self.seconds[layer] = self.seconds.get(layer, 0.0) + seconds
+
+    def total_seconds(self):
+        return sum(self.seconds.values())
+
+    def memo_hit_rate(self):
+        return float(self.memo_hits) / max(1, self.memo_hits + self.memo_misses)
+
+
+class Instrumentation(object):
+    def __init__(self):
+        # NetworkStats by WeightSet, since the generation began
+        self.networks = {}
+        self.hand_seconds = 0.0
+        self.hand_calls = 0
+
+        # a summary dict of each finished generation
+        self.generations = []
+
+        # the network being pulsed, and the time of the Perceptrons pulled from by each one being timed
+        self.current = None
+        self.child_seconds = []
+        self.hand_depth = 0
+
+    def stats_for(self, nn):
+        stats = self.networks.get(nn.weightset)
+        if stats is None:
+            stats = self.networks[nn.weightset] = NetworkStats(nn)
+        return stats
+
+    def begin_generation(self):
+        self.networks = {}
+        self.hand_seconds = 0.0
+        self.hand_calls = 0
+
+    def end_generation(self, seconds):
+        networks = self.networks.values()
+        inference_seconds = sum([stats.total_seconds() for stats in networks])
+        memo_hits = sum([stats.memo_hits for stats in networks])
+        memo_misses = sum([stats.memo_misses for stats in networks])
+        self.generations.append({'seconds': seconds, 'networks': len(networks),
+                                 'pulses': sum([stats.pulses for stats in networks]),
+                                 'inference_seconds': inference_seconds, 'hand_seconds': self.hand_seconds,
+                                 'hand_calls': self.hand_calls,
+                                 'memo_hit_rate': float(memo_hits) / max(1, memo_hits + memo_misses),
+                                 'sigmoid_calls': sum([stats.sigmoid_calls for stats in networks])})
+
+
+# the instrumentation enabled, and what it replaced
+active = None
+originals = []
+
+
+def patch(cls, name, wrapper):
+    original = cls.__dict__[name]
+    originals.append((cls, name, original))
+    setattr(cls, name, wrapper(original))
+
+
+def timed_pulse(original):
+    def pulse(self, keys=None):
+        stats = active.stats_for(self)
+        previous, active.current = active.current, stats
+        started = default_timer()
+        try:
+            original(self, keys)
+        finally:
+            active.current = previous
+        stats.pulses += 1
+        if self.engine is not None:
+            stats.add_seconds('engine', default_timer() - started)
+            stats.sigmoid_calls += stats.engine_sigmoids + len(keys if keys is not None else self.output_keys)
+    return pulse
+
+
+# the layer a Perceptron is in, worked out once
+def layer_of(perceptron):
+    try:
+        return perceptron._instrument_layer
+    except AttributeError:
+        if isinstance(perceptron, InputPerceptron):
+            layer = 'input'
+        elif isinstance(perceptron, OutputPerceptron):
+            layer = 'output'
+        elif [neuron for neuron in perceptron.inputs if isinstance(neuron, HiddenPerceptron)]:
+            layer = 'jidden'
+        else:
+            layer = 'hidden'
+        perceptron._instrument_layer = layer
+        return layer
+
+
+# charge a Perceptron's time to its layer, less the time of the ones it pulls from
+def timed_output(original):
+    def generate_output(self, indent_level=0, getlast=True):
+        stats = active.current
+        if stats is None:
+            return original(self, indent_level, getlast)
+        if getlast is True and self.memo is not False:
+            stats.memo_hits += 1
+            return self.memo
+
+        active.child_seconds.append(0.0)
+        started = default_timer()
+        try:
+            value = original(self, indent_level, getlast)
+        finally:
+            seconds = default_timer() - started
+            children = active.child_seconds.pop()
+        stats.add_seconds(layer_of(self), seconds - children)
+        if active.child_seconds:
+            active.child_seconds[-1] += seconds
+
+        if isinstance(self, InputPerceptron) or self.inputs:
+            stats.sigmoid_calls += 1
+        if not isinstance(self, InputPerceptron):
+            stats.memo_misses += 1
+        return value
+    return generate_output
+
+
+# time only the outermost call, as the analysis methods call one another
+def timed_hand(original):
+    def method(*args, **kwargs):
+        active.hand_depth += 1
+        started = default_timer()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            active.hand_depth -= 1
+            if active.hand_depth == 0:
+                active.hand_seconds += default_timer() - started
+                active.hand_calls += 1
+    return method
+
+
+def timed_fitness_test(original):
+    def fitness_test(self):
+        assert self.processes == 1 and self.coordinator is None, \
+            "instrumentation only counts matches played in this process"
+        active.begin_generation()
+        started = default_timer()
+        try:
+            return original(self)
+        finally:
+            active.end_generation(default_timer() - started)
+    return fitness_test
+
+
+# start instrumenting, returning the Instrumentation the counts are kept in
+def enable():
+    global active
+    if active is not None:
+        return active
+
+    active = Instrumentation()
+    patch(NeuralNet, 'pulse', timed_pulse)
+    patch(Perceptron, 'generate_output', timed_output)
+    patch(InputPerceptron, 'generate_output', timed_output)
+    for cls, names in HAND_METHODS.items():
+        for name in names:
+            patch(cls, name, timed_hand)
+    patch(Population, 'fitness_test', timed_fitness_test)
+    return active
+
+
+# stop instrumenting, returning the Instrumentation the counts were kept in
+def disable():
+    global active
+    while originals:
+        cls, name, original = originals.pop()
+        setattr(cls, name, original)
+    instrumentation, active = active, None
+    return instrumentation
+
+
+# each network's counts, with its share of the pulses' time by layer
+def draw_network_report(instrumentation):
+    layers = ['input', 'hidden', 'jidden', 'output', 'engine']
+    table = Texttable(max_width=115)
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.set_cols_dtype(['i', 'i', 'f', 'f', 'i'] + ['f'] * len(layers))
+    rows = [["network", "pulses", "us per pulse", "memo hit rate", "sigmoids per pulse"] + layers]
+    networks = sorted(instrumentation.networks.values(), key=lambda stats: -stats.pulses)
+    for i in range(len(networks)):
+        stats = networks[i]
+        seconds = max(stats.total_seconds(), 1e-12)
+        rows.append([i, stats.pulses, 1e6 * stats.total_seconds() / max(1, stats.pulses), stats.memo_hit_rate(),
+                     stats.sigmoid_calls / max(1, stats.pulses)] +
+                    [stats.seconds.get(layer, 0.0) / seconds for layer in layers])
+    table.add_rows(rows)
+    return table.draw()
+
+
+# each generation's time, and how much of it went to pulses and to analysing hands
+def draw_generation_report(instrumentation):
+    table = Texttable(max_width=115)
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.set_cols_dtype(['i', 'f', 'i', 'i', 'f', 'f', 'f', 'i'])
+    rows = [["generation", "seconds", "networks", "pulses", "inference share", "hand share", "memo hit rate",
+             "sigmoids"]]
+    for i in range(len(instrumentation.generations)):
+        generation = instrumentation.generations[i]
+        seconds = max(generation['seconds'], 1e-12)
+        rows.append([i, generation['seconds'], generation['networks'], generation['pulses'],
+                     generation['inference_seconds'] / seconds, generation['hand_seconds'] / seconds,
+                     generation['memo_hit_rate'], generation['sigmoid_calls']])
+    table.add_rows(rows)
+    return table.draw()
@@ -0,0 +1,617 @@
+#!/usr/bin/python
+#
+# neuralengine.py
+#
+# 2026/10/18
+# rg
+#
+# alternative compute engines for NeuralNet.pulse(). an engine is built once from a WeightSet and then turns a list
+# of input values into a list of output values, one per output neuron (in NeuralNet.outputs.keys() order). given a
+# list of output rows, evaluate() only computes (and returns, in that order) those output neurons.
+
+from pylru import lrucache
+from texttable import *
+from utility import *
+from activation import get_sigmoid, get_vector_sigmoid
+import activation
+import random
+import sys
+import timeit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# optional just-in-time compiler
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# flatten the weights into one matrix per layer and run a pulse as matrix-vector products
+class NumpyEngine(object):
+    def __init__(self, weightset, input_weights):
+        assert numpy is not None, "the numpy engine requires numpy"
+
+        self.input_weights = numpy.array(input_weights, dtype=numpy.float64)
+        self.sigmoid = get_vector_sigmoid()
+
+        # one (neurons x inputs) matrix per layer, fed in this order
+        self.layers = []
+        for name in weightset.names()[1:]:
+            self.layers.append(weightset.matrix(name))
+
+    # the first hidden layer's weighted sum of the input neurons, before the bias and sigmoid
+    def first_layer(self, inputs):
+        # input neurons weight and squash their own sense of the world
+        signal = self.sigmoid(numpy.array(inputs, dtype=numpy.float64) * self.input_weights)
+        return self.layers[0].dot(signal)
+
+    def evaluate(self, inputs, rows=None):
+        # each layer also gets a bias neuron with an output of 1 and a weight of 1
+        signal = self.sigmoid(self.first_layer(inputs) + 1)
+        for weights in self.layers[1:-1]:
+            signal = self.sigmoid(weights.dot(signal) + 1)
+
+        output_weights = self.layers[-1]
+        if rows is not None:
+            output_weights = output_weights[rows]
+        return self.sigmoid(output_weights.dot(signal) + 1).tolist()
+
+
+# every observer reports small integers (card rankings 0-52, deck height, scores), so each input neuron's contribution
+# to the first hidden layer can be looked up instead of computed. values outside the table are computed as usual.
+class EmbeddingEngine(NumpyEngine):
+    table_size = 53
+
+    def __init__(self, weightset, input_weights):
+        super(EmbeddingEngine, self).__init__(weightset, input_weights)
+
+        # tables[i, v] is what input neuron i adds to each hidden neuron when it senses v
+        activations = self.sigmoid(numpy.outer(self.input_weights, numpy.arange(self.table_size)))
+        self.tables = activations[:, :, numpy.newaxis] * self.layers[0].T[:, numpy.newaxis, :]
+        self.input_indexes = numpy.arange(len(self.input_weights))
+
+    def first_layer(self, inputs):
+        inputs = numpy.array(inputs, dtype=numpy.float64)
+        values = inputs.astype(numpy.int64)
+        in_table = (values == inputs) & (values >= 0) & (values < self.table_size)
+
+        weighted = self.tables[self.input_indexes[in_table], values[in_table]].sum(axis=0)
+        if not in_table.all():
+            outside = ~in_table
+            signal = self.sigmoid(inputs[outside] * self.input_weights[outside])
+            weighted += self.layers[0][:, outside].dot(signal)
+
+        return weighted
+
+
+# from one decision to the next only a handful of inputs change (a card in or out of the hand, a discard, the deck
+# height), so we keep the first hidden layer's weighted sums between pulses and only add in the changed inputs.
+# a full recompute every refresh_interval pulses keeps floating point drift from piling up.
+class DeltaEngine(object):
+    refresh_interval = 1000
+
+    def __init__(self, weightset, input_weights):
+        self.input_weights = list(input_weights)
+        self.sigmoid = get_sigmoid()
+
+        # columns[i] holds input neuron i's weight into each first layer hidden neuron
+        self.columns = [list(column) for column in zip(*weightset.layer('hidden'))]
+
+        # the remaining layers are computed in full every pulse
+        self.layers = []
+        for name in weightset.names()[2:]:
+            self.layers.append(weightset.layer(name))
+
+        self.last_inputs = None
+        self.activations = None    # the output of each input neuron as of the last pulse
+        self.sums = None           # each first layer hidden neuron's weighted sum, without the bias
+        self.pulses = 0
+
+    # rebuild the weighted sums from scratch
+    def recompute(self, inputs):
+        self.activations = [self.sigmoid(inputs[i] * self.input_weights[i]) for i in range(len(inputs))]
+        self.sums = [0.0] * len(self.columns[0])
+        for i in range(len(inputs)):
+            output = self.activations[i]
+            self.sums = [total + weight * output for total, weight in zip(self.sums, self.columns[i])]
+        self.last_inputs = list(inputs)
+
+    # add weight * delta into the weighted sums for each input that changed since the last pulse
+    def propagate(self, inputs):
+        last_inputs = self.last_inputs
+        for i in range(len(inputs)):
+            if inputs[i] != last_inputs[i]:
+                output = self.sigmoid(inputs[i] * self.input_weights[i])
+                delta = output - self.activations[i]
+                self.activations[i] = output
+                last_inputs[i] = inputs[i]
+                if delta != 0:
+                    self.sums = [total + weight * delta for total, weight in zip(self.sums, self.columns[i])]
+
+    def evaluate(self, inputs, rows=None):
+        if self.last_inputs is None or self.pulses % self.refresh_interval == 0:
+            self.recompute(inputs)
+        else:
+            self.propagate(inputs)
+        self.pulses += 1
+
+        # each layer also gets a bias neuron with an output of 1 and a weight of 1
+        sigmoid = self.sigmoid
+        signal = [sigmoid(total + 1) for total in self.sums]
+        for i in range(len(self.layers)):
+            layer = self.layers[i]
+            if rows is not None and i == len(self.layers) - 1:
+                layer = [layer[row] for row in rows]
+            signal = [sigmoid(sum([weight * value for weight, value in zip(row, signal)]) + 1) for row in layer]
+
+        return signal
+
+
+# compile the weights into straight-line python: one local variable per neuron and every weight baked in as a
+# constant, so a pulse runs no loops, dict lookups or recursion. the compiled function is cached per set of weights,
+# as every match a GeneSet plays would otherwise compile the same function again.
+class CompiledEngine(object):
+    cache = lrucache(256)
+
+    def __init__(self, weightset, input_weights):
+        layers = [weightset.layer(name) for name in weightset.names()[1:]]
+
+        key = (activation.mode, tuple(input_weights)) + \
+            tuple([tuple([tuple(row) for row in layer]) for layer in layers])
+        try:
+            self.function = CompiledEngine.cache[key]
+        except KeyError:
+            self.function = CompiledEngine.compile(input_weights, layers)
+            CompiledEngine.cache[key] = self.function
+
+    # the last layer's neurons are only computed when their row is asked for
+    @staticmethod
+    def generate_source(input_weights, layers):
+        names = ['x%d' % i for i in range(len(input_weights))]
+        lines = ['def evaluate(inputs, rows=None):',
+                 '    %s, = inputs' % ', '.join(names)]
+
+        # input neurons
+        previous = []
+        for i in range(len(input_weights)):
+            lines.append('    a%d = sigmoid(%s * %r)' % (i, names[i], input_weights[i]))
+            previous.append('a%d' % i)
+
+        # each layer also gets a bias neuron with an output of 1 and a weight of 1
+        for layer_number in range(len(layers) - 1):
+            current = []
+            for i in range(len(layers[layer_number])):
+                row = layers[layer_number][i]
+                terms = ' + '.join(['%s * %r' % (previous[j], row[j]) for j in range(len(row))])
+                lines.append('    l%d_%d = sigmoid(%s + 1)' % (layer_number, i, terms))
+                current.append('l%d_%d' % (layer_number, i))
+            previous = current
+
+        output_layer = layers[-1]
+        lines.append('    if rows is None:')
+        lines.append('        rows = %r' % (range(len(output_layer)),))
+        lines.append('    outputs = []')
+        lines.append('    for row in rows:')
+        for i in range(len(output_layer)):
+            row = output_layer[i]
+            terms = ' + '.join(['%s * %r' % (previous[j], row[j]) for j in range(len(row))])
+            lines.append('        %s row == %d:' % ('if' if i == 0 else 'elif', i))
+            lines.append('            outputs.append(sigmoid(%s + 1))' % terms)
+        lines.append('    return outputs')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def compile(input_weights, layers):
+        namespace = {'sigmoid': get_sigmoid()}
+        exec(compile(CompiledEngine.generate_source(input_weights, layers), '<compiled network>', 'exec'), namespace)
+        return namespace['evaluate']
+
+    def evaluate(self, inputs, rows=None):
+        return self.function(inputs, rows)
+
+
+# drop the weights closer to zero than threshold and store each layer as compressed sparse rows, so a pulse costs
+# time in proportion to the connections we keep. input neurons that no longer feed anything aren't computed at all.
+class SparseEngine(object):
+    default_threshold = 0.1
+
+    def __init__(self, weightset, input_weights, threshold=None):
+        if threshold is None:
+            threshold = SparseEngine.default_threshold
+        self.threshold = threshold
+        self.sigmoid = get_sigmoid()
+        self.input_weights = list(input_weights)
+
+        # per layer: (indptr, indices, data). row i's weights are data[indptr[i]:indptr[i+1]], on the inputs in
+        # indices[indptr[i]:indptr[i+1]]
+        self.layers = []
+        self.kept, self.total = 0, 0
+        for name in weightset.names()[1:]:
+            indptr, indices, data = [0], [], []
+            for row in weightset.layer(name):
+                for j in range(len(row)):
+                    if abs(row[j]) >= threshold:
+                        indices.append(j)
+                        data.append(row[j])
+                indptr.append(len(data))
+                self.total += len(row)
+            self.kept += len(data)
+            self.layers.append((indptr, indices, data))
+
+        # the input neurons still connected to the first hidden layer
+        self.used_inputs = sorted(set(self.layers[0][1]))
+
+    # the fraction of connections kept
+    def density(self):
+        return float(self.kept) / max(1, self.total)
+
+    def evaluate(self, inputs, rows=None):
+        sigmoid = self.sigmoid
+        input_weights = self.input_weights
+
+        signal = [0.0] * len(inputs)
+        for i in self.used_inputs:
+            signal[i] = sigmoid(inputs[i] * input_weights[i])
+
+        # each layer also gets a bias neuron with an output of 1 and a weight of 1
+        for layer_number in range(len(self.layers)):
+            indptr, indices, data = self.layers[layer_number]
+            layer_rows = range(len(indptr) - 1)
+            if rows is not None and layer_number == len(self.layers) - 1:
+                layer_rows = rows
+
+            outputs = []
+            for i in layer_rows:
+                total = 1
+                for k in range(indptr[i], indptr[i + 1]):
+                    total += data[k] * signal[indices[k]]
+                outputs.append(sigmoid(total))
+            signal = outputs
+
+        return signal
+
+
+# an engine class with the options to build it with, called as a factory like any other. unlike a closure it pickles
+# (as the class's name and its options), so a Population can be stored with one.
+class EngineSpec(object):
+    def __init__(self, engine_class, **options):
+        self.engine_class = engine_class
+        self.options = options
+
+    def __call__(self, weightset, input_weights):
+        return self.engine_class(weightset, input_weights, **self.options)
+
+
+# an engine factory for a SparseEngine with the given threshold
+def sparse_engine(threshold):
+    return EngineSpec(SparseEngine, threshold=threshold)
+
+
+# weights stored at reduced precision: 'float32' arrays, or 'int8' with one scale per layer (weight = value * scale).
+# pulses run on the stored format directly, in float32.
+class CompactEngine(object):
+    def __init__(self, weightset, input_weights, precision=None):
+        assert numpy is not None, "the compact engines require numpy"
+        if precision is None:
+            precision = 'float32'
+        assert precision in ('float32', 'int8'), "unknown precision: " + str(precision)
+        self.precision = precision
+        self.sigmoid = get_vector_sigmoid()
+
+        # (weights, scale) per layer, starting with the input neurons' own weights
+        self.layers = []
+        for weights in [input_weights] + [weightset.layer(name) for name in weightset.names()[1:]]:
+            weights = numpy.array(weights, dtype=numpy.float32)
+            if precision == 'int8':
+                scale = numpy.float32(max(numpy.abs(weights).max(), 1e-12) / 127)
+                weights = numpy.round(weights / scale).astype(numpy.int8)
+            else:
+                scale = numpy.float32(1)
+            self.layers.append((weights, scale))
+
+    # bytes taken by the stored weights
+    def nbytes(self):
+        return sum([weights.nbytes + scale.nbytes for weights, scale in self.layers])
+
+    def evaluate(self, inputs, rows=None):
+        # exp() overflows float32 well before the sigmoid saturates at -100. the result still comes out as 0.
+        with numpy.errstate(over='ignore'):
+            input_weights, scale = self.layers[0]
+            signal = self.sigmoid(numpy.array(inputs, dtype=numpy.float32) * input_weights * scale)
+
+            # each layer also gets a bias neuron with an output of 1 and a weight of 1
+            for i in range(1, len(self.layers)):
+                weights, scale = self.layers[i]
+                if rows is not None and i == len(self.layers) - 1:
+                    weights = weights[rows]
+                signal = self.sigmoid(weights.dot(signal) * scale + 1)
+
+        return signal.tolist()
+
+
+# an engine factory for a CompactEngine at the given precision
+def compact_engine(precision):
+    return EngineSpec(CompactEngine, precision=precision)
+
+
+# numpy weights with each layer's pass compiled to machine code by numba, when it's installed. it only has the exact
+# sigmoid, so it can't be built under another activation mode, and it always computes every output neuron.
+class JitEngine(NumpyEngine):
+    def __init__(self, weightset, input_weights):
+        assert numba is not None, "the jit engine requires numba"
+        assert activation.mode == 'exact', "the jit engine only has the exact sigmoid"
+        super(JitEngine, self).__init__(weightset, input_weights)
+
+    def evaluate(self, inputs, rows=None):
+        outputs = _jit_inputs(numpy.array(inputs, dtype=numpy.float64), self.input_weights)
+        for weights in self.layers:
+            outputs = _jit_layer(weights, outputs)
+        if rows is not None:
+            outputs = outputs[rows]
+        return outputs.tolist()
+
+
+if numba is not None:
+    @numba.njit
+    def _jit_sigmoid(num):
+        if num < -100:
+            return 0.0
+        elif num > 100:
+            return 1.0
+        return 1.0 / (1.0 + numpy.exp(-num))
+
+    @numba.njit
+    def _jit_layer(weights, signal):
+        result = numpy.empty(weights.shape[0])
+        for i in range(weights.shape[0]):
+            total = 1.0
+            for j in range(weights.shape[1]):
+                total += weights[i, j] * signal[j]
+            result[i] = _jit_sigmoid(total)
+        return result
+
+    @numba.njit
+    def _jit_inputs(inputs, input_weights):
+        signal = numpy.empty(inputs.shape[0])
+        for i in range(inputs.shape[0]):
+            signal[i] = _jit_sigmoid(inputs[i] * input_weights[i])
+        return signal
+
+
+# engines available for NeuralNet(engine=...), keyed by name. each is a factory called as
+# factory(weightset, input_weights). 'graph' maps to None: NeuralNet builds its own Perceptron objects for it.
+ENGINES = {}
+
+# the names of the engines that compute the same outputs as the graph (up to rounding). only these are benchmarked
+# and picked from for 'auto': the lossy ones (pruned or reduced precision) are only used when asked for by name.
+EXACT_ENGINES = []
+
+# the engine picked by select_engine() for each topology it has run for, keyed by Topology.describe()
+selected_engines = {}
+
+
+def register_engine(name, factory, exact=True):
+    ENGINES[name] = factory
+    if name in EXACT_ENGINES:
+        EXACT_ENGINES.remove(name)
+    if exact:
+        EXACT_ENGINES.append(name)
+
+
+register_engine('graph', None)
+register_engine('compiled', CompiledEngine)
+register_engine('delta', DeltaEngine)
+register_engine('sparse', SparseEngine, exact=False)
+if numpy is not None:
+    register_engine('numpy', NumpyEngine)
+    register_engine('embedding', EmbeddingEngine)
+    register_engine('float32', compact_engine('float32'), exact=False)
+    register_engine('int8', compact_engine('int8'), exact=False)
+if numba is not None:
+    register_engine('jit', JitEngine)
+
+
+# play out a series of game states: each turn a card is drawn and a random one discarded. returns the observers of
+# a GinNeuralNet (player, table, match) and a list of their buffers, one entry per state.
+def record_states(count):
+    # imported here, as neuralnet imports us
+    from ginmatch import GinMatch, GinPlayer
+    from observer import Observer
+
+    player, opponent = GinPlayer(), GinPlayer()
+    match = GinMatch(player, opponent)
+    observers = [Observer(player), Observer(match.table), Observer(match)]
+    states = []
+    while len(states) < count:
+        if len(match.table.deck.cards) < 12:
+            match.table.refresh_deck()
+            player.empty_hand()
+        while player.hand.size() < 10:
+            player.draw()
+        player.draw()
+        player.discard_card(player.hand.get_card_at_index(random.randint(0, 10)))
+        player.noop_notify()
+        states.append([dict(observer.buffer) for observer in observers])
+
+    return observers, states
+
+
+# put the observers back into a recorded state
+def restore_state(observers, state):
+    for i in range(len(observers)):
+        observers[i].buffer = state[i]
+
+
+# the decisions a NeuralGinStrategy would read from a GinNeuralNet's outputs: (start action, end action, card index,
+# accept improper knock), each as a bucket index
+def decode_decisions(outputs):
+    from ginstrategy import NeuralGinStrategy
+
+    return (NeuralGinStrategy.decode_signal(outputs['action_start'], 2),
+            NeuralGinStrategy.decode_signal(outputs['action_end'], 3),
+            NeuralGinStrategy.decode_signal(outputs['index'], 11),
+            NeuralGinStrategy.decode_signal(outputs['accept_improper_knock'], 2))
+
+
+# build a GinNeuralNet with the given engine and activation mode, and return its decisions for each recorded state
+def replay_decisions(observers, states, weightset, engine, activation_mode='exact'):
+    from neuralnet import GinNeuralNet
+
+    previous_mode = activation.mode
+    activation.set_mode(activation_mode)
+    try:
+        nn = GinNeuralNet(observers, weightset, engine=engine)
+    finally:
+        activation.set_mode(previous_mode)
+
+    decisions = []
+    for state in states:
+        restore_state(observers, state)
+        nn.pulse()
+        decisions.append(decode_decisions(nn.outputs))
+    return decisions
+
+
+# time a GinNeuralNet over the recorded states, in seconds per pulse, keeping the best of a few runs
+def time_pulses(nn, observers, states):
+    def run_states():
+        for state in states:
+            restore_state(observers, state)
+            nn.pulse()
+
+    # warm up caches and compilers first
+    run_states()
+    return min(timeit.repeat(run_states, repeat=3, number=1)) / len(states)
+
+
+# time each engine (by default, each exact one) pulsing a random GinNeuralNet of the given topology (by default, 49
+# inputs, two hidden layers of 35 and 4 outputs) over a series of game states. an engine that can't be built for the
+# topology is left out. returns {engine name: seconds per pulse}.
+def benchmark_engines(names=None, pulses=50, topology=None):
+    # imported here, as they import us
+    from topology import Topology
+    from genetic_algorithm import GeneSet
+
+    if names is None:
+        names = list(EXACT_ENGINES)
+    if topology is None:
+        topology = Topology()
+
+    observers, states = record_states(pulses)
+    geneset = GeneSet(topology.genome_length())
+
+    timings = {}
+    for name in names:
+        try:
+            nn = topology.build(observers, geneset, name)
+        except AssertionError:
+            continue
+        timings[name] = time_pulses(nn, observers, states)
+
+    return timings
+
+
+# pick the fastest exact engine on this machine for the given topology (by default, Topology()), benchmarking only on
+# the first call for each
+def select_engine(topology=None):
+    from topology import Topology
+
+    if topology is None:
+        topology = Topology()
+    key = topology.describe()
+    if key not in selected_engines:
+        timings = benchmark_engines(topology=topology)
+        selected_engines[key] = min(timings, key=timings.get)
+        log_info("engine benchmark for {0} (ms per pulse): {1}. selected: {2}".format(
+            key, dict([(name, round(1000 * timings[name], 3)) for name in timings]), selected_engines[key]))
+    return selected_engines[key]
+
+
+# compare pruning thresholds for a GinNeuralNet with the given weights: the density each one keeps, its speedup over
+# the unpruned network (threshold 0) and how often its decisions agree with the unpruned network's
+def sparsity_report(weightset, thresholds=None, pulses=100):
+    from neuralnet import GinNeuralNet
+
+    if thresholds is None:
+        thresholds = [0.05, 0.1, 0.25, 0.5]
+
+    observers, states = record_states(pulses)
+    dense_time = time_pulses(GinNeuralNet(observers, weightset, engine=sparse_engine(0)), observers, states)
+    dense_decisions = replay_decisions(observers, states, weightset, sparse_engine(0))
+
+    rows = []
+    for threshold in thresholds:
+        nn = GinNeuralNet(observers, weightset, engine=sparse_engine(threshold))
+        speedup = dense_time / time_pulses(nn, observers, states)
+        decisions = replay_decisions(observers, states, weightset, sparse_engine(threshold))
+        agreement = float(len([i for i in range(len(states)) if decisions[i] == dense_decisions[i]])) / len(states)
+        rows.append({'threshold': threshold, 'density': nn.engine.density(), 'speedup': speedup,
+                     'agreement': agreement})
+
+    return rows
+
+
+# the sparsity_report as a table
+def draw_sparsity_report(rows):
+    table = Texttable()
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.add_rows([["threshold", "density", "speedup", "decision agreement"]] +
+                   [[row['threshold'], row['density'], row['speedup'], row['agreement']] for row in rows])
+    return table.draw()
+
+
+# bytes a WeightSet's nested lists of python floats take up, containers included
+def weightset_nbytes(weightset):
+    weights = dict([(name, weightset.layer(name)) for name in weightset.names()])
+    nbytes = sys.getsizeof(weights)
+    for name in weightset.names():
+        layer = weights[name]
+        nbytes += sys.getsizeof(layer)
+        for row in layer:
+            if isinstance(row, list):
+                nbytes += sys.getsizeof(row) + sum([sys.getsizeof(weight) for weight in row])
+            else:
+                nbytes += sys.getsizeof(row)
+    return nbytes
+
+
+# compare the reduced precision formats against the float64 numpy engine for a GinNeuralNet with the given weights:
+# the bytes each takes, the largest difference in any output and how often its decisions agree with float64
+def precision_report(weightset, pulses=100):
+    from neuralnet import GinNeuralNet
+
+    observers, states = record_states(pulses)
+    reference = GinNeuralNet(observers, weightset, engine='numpy')
+    reference_decisions = replay_decisions(observers, states, weightset, 'numpy')
+
+    rows = [{'precision': 'float64 lists', 'bytes': weightset_nbytes(weightset), 'max_error': 0.0, 'agreement': 1.0}]
+    for precision in ('float32', 'int8'):
+        nn = GinNeuralNet(observers, weightset, engine=compact_engine(precision))
+        max_error = 0.0
+        for state in states:
+            restore_state(observers, state)
+            reference.pulse()
+            nn.pulse()
+            for key in reference.outputs:
+                max_error = max(max_error, abs(reference.outputs[key] - nn.outputs[key]))
+
+        decisions = replay_decisions(observers, states, weightset, compact_engine(precision))
+        agreement = float(len([i for i in range(len(states)) if decisions[i] == reference_decisions[i]])) / len(states)
+        rows.append({'precision': precision, 'bytes': nn.engine.nbytes(), 'max_error': max_error,
+                     'agreement': agreement})
+
+    return rows
+
+
+# the precision_report as a table
+def draw_precision_report(rows):
+    table = Texttable()
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.set_cols_dtype(['t', 'i', 'e', 'f'])
+    table.add_rows([["precision", "bytes", "max output error", "decision agreement"]] +
+                   [[row['precision'], row['bytes'], row['max_error'], row['agreement']] for row in rows])
+    return table.draw()
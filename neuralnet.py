@@ -7,18 +7,31 @@
 #
 # base neural networking classes
 
-from math import exp
 from utility import *
 from texttable import *
+import copy
+from array import array
+from neuralengine import *
+from activation import get_sigmoid, sigmoid_exact
 
 
 class NeuralNet(object):
     # take in an array of observers, a dict of lists of weights (weights[input]=[0.1,0.2,...]) and an array
-    # of output_keys
-    def __init__(self, observers, weightset, output_keys):
+    # of output_keys. the engine picks how pulse() is computed: 'graph' walks the Perceptron objects, while the
+    # other engines (see neuralengine.py) work on flattened copies of the weights. an engine is either a name
+    # from ENGINES, 'auto' for the fastest exact one on this machine for the weightset's topology, or a factory called
+    # as engine(weightset, input_weights).
+    def __init__(self, observers, weightset, output_keys, engine=None):
         assert len(observers) > 0, 'must have at least one observer'
-        assert len(weightset.weights) > 0, 'must have non-empty weights dict'
+        assert len(weightset.names()) > 0, 'must have non-empty weights dict'
         assert len(output_keys) > 0, 'must have at least one output_key'
+        if engine is None:
+            engine = 'graph'
+        elif engine == 'auto':
+            engine = select_engine(weightset.topology)
+        if isinstance(engine, basestring):
+            assert engine in ENGINES, "unknown engine: " + engine
+            engine = ENGINES[engine]
 
         self.observers = observers
 
@@ -28,23 +41,33 @@ class NeuralNet(object):
         for key in output_keys:
             self.outputs[key] = None
 
+        # the output keys in row order: the row of each output neuron in the output layer (and in an engine's outputs)
+        self.output_keys = self.outputs.keys()
+        self.output_rows = {}
+        for i in range(len(self.output_keys)):
+            self.output_rows[self.output_keys[i]] = i
+
         self.input_layer = []
         self.hidden_layer = []
         self.jidden_layer = []
         self.output_layer = []
 
-        self.create_input_layer()     # a list of Perceptrons
-        self.create_hidden_layer()    # a list of Perceptrons
-        self.create_jidden_layer()    # a list of Perceptrons
-        self.create_output_layer()    # a list of {output_key:Perceptron} dicts
+        self.engine = None
+        if engine is None:
+            self.create_input_layer()     # a list of Perceptrons
+            self.create_hidden_layer()    # a list of Perceptrons
+            self.create_jidden_layer()    # a list of Perceptrons
+            self.create_output_layer()    # a list of {output_key:Perceptron} dicts
+        else:
+            self.engine = engine(self.weightset, self.gather_input_weights())
 
         self.validate_weights()
 
     def validate_weights(self):
         # ensure we have an input, hidden and output key
-        assert 'input'  in self.weightset.weights, "no input  weights"
-        assert 'hidden' in self.weightset.weights, "no hidden weights"
-        assert 'output' in self.weightset.weights, "no output weights"
+        assert 'input'  in self.weightset.names(), "no input  weights"
+        assert 'hidden' in self.weightset.names(), "no hidden weights"
+        assert 'output' in self.weightset.names(), "no output weights"
 
         # calculate how many inputs we have
         expected_input_count = 0
@@ -54,14 +77,38 @@ class NeuralNet(object):
         # offload the work to the weightset
         return self.weightset.validate(expected_input_count, self.calculate_hidden_count(), len(self.outputs))
 
+    def calculate_input_count(self):
+        return sum([observer.width for observer in self.observers])
+
+    # the first hidden layer's width: the one our Topology declares, or 2/3 of the inputs and outputs
     def calculate_hidden_count(self):
-        return int((len(self.input_layer) + len(self.outputs)) * 2/3)
+        if self.weightset.topology is not None:
+            return self.weightset.topology.hidden[0]
+        return int((self.calculate_input_count() + len(self.outputs)) * 2/3)
+
+    # the input weight for each input neuron, in input_layer order. each observer reuses weights['input'] from 0.
+    def gather_input_weights(self):
+        weights = self.weightset.layer('input')
+        input_weights = []
+        for observer in self.observers:
+            for key in range(observer.width):
+                input_weights.append(weights[key])
+        return input_weights
+
+    # the current value of each input neuron, in input_layer order
+    def gather_inputs(self):
+        inputs = []
+        for observer in self.observers:
+            for key in range(observer.width):
+                inputs.append(observer.get_value_by_index(key))
+        return inputs
 
     def create_input_layer(self):
+        weights = self.weightset.layer('input')
         for observer in self.observers:
             for key in range(observer.width):
                 # take advantage of the buffer key indexing (0, 1, ...) to match up with the appropriate weight
-                weight = self.weightset.weights['input'][key]
+                weight = weights[key]
                 # create a uniqueish id
                 myid = observer.__class__.__name__ + '-' + str(observer.id) + '-' + str(key)
                 self.input_layer.append(InputPerceptron(observer, weight=weight, myid=myid, index=key))
@@ -70,14 +117,17 @@ class NeuralNet(object):
     def create_hidden_layer(self):
         count = self.calculate_hidden_count()
         for i in range(count):
-            hp = HiddenPerceptron(self.input_layer, self.weightset.weights['hidden'][i])
+            hp = HiddenPerceptron(self.input_layer, self.weightset.row('hidden', i))
             hp.add_input(BiasPerceptron(1), 1)
             self.hidden_layer.append(hp)
 
+    # the second hidden layer, when our weights have one
     def create_jidden_layer(self):
-        count = self.calculate_hidden_count()
+        if 'jidden' not in self.weightset.names():
+            return
+        count = self.weightset.shape('jidden')[0]
         for i in range(count):
-            jp = HiddenPerceptron(self.hidden_layer, self.weightset.weights['jidden'][i])
+            jp = HiddenPerceptron(self.hidden_layer, self.weightset.row('jidden', i))
             jp.add_input(BiasPerceptron(1), 1)
             self.jidden_layer.append(jp)
 
@@ -85,18 +135,62 @@ class NeuralNet(object):
     def create_output_layer(self):
         count = len(self.outputs)
         for i in range(count):
-            key = self.outputs.keys()[i]
-            op = OutputPerceptron(self.jidden_layer, self.weightset.weights['output'][i], key)
+            key = self.output_keys[i]
+            op = OutputPerceptron(self.jidden_layer or self.hidden_layer, self.weightset.row('output', i), key)
             op.add_input(BiasPerceptron(1), 1)
             self.output_layer.append({key: op})
 
-    # pulse the neural net and store the output for later use
-    def pulse(self):
-        # fire each output neuron
+    # pulse the neural net and store the output for later use. given a list of output keys, only those output neurons
+    # are computed, the rest keep their value from an earlier pulse.
+    def pulse(self, keys=None):
+        if self.engine is not None:
+            if keys is None:
+                keys = self.output_keys
+                values = self.engine.evaluate(self.gather_inputs())
+            else:
+                values = self.engine.evaluate(self.gather_inputs(), [self.output_rows[key] for key in keys])
+            for key, value in zip(keys, values):
+                self.outputs[key] = value
+            return
+
+        if keys is None:
+            keys = self.output_keys
+
+        # forget the last pulse. the memo only saves work within a pulse, otherwise we never see new observations.
+        for neuron in self.hidden_layer + self.jidden_layer:
+            neuron.memo = False
         for item in self.output_layer:
-            output_key = item.keys()[0]
-            output_neuron = item[output_key]
-            self.outputs[output_key] = output_neuron.generate_output()
+            item.values()[0].memo = False
+
+        # fire each output neuron asked for. the hidden layers are shared through their memos.
+        for key in keys:
+            output_neuron = self.output_layer[self.output_rows[key]][key]
+            self.outputs[key] = output_neuron.generate_output()
+
+    # a copy of this network reading from another set of observers (e.g. the same player's seat in a new match). the
+    # weights and a compiled engine are shared rather than rebuilt, but the Perceptron graph is wired to its observers
+    # and has to be built again.
+    def attach(self, observers):
+        assert [observer.width for observer in observers] == [observer.width for observer in self.observers], \
+            "observers must have the same widths as the ones we were built with"
+
+        nn = copy.copy(self)
+        nn.observers = observers
+        nn.outputs = dict.fromkeys(self.output_keys)
+        if self.engine is None:
+            nn.input_layer, nn.hidden_layer, nn.jidden_layer, nn.output_layer = [], [], [], []
+            nn.create_input_layer()
+            nn.create_hidden_layer()
+            nn.create_jidden_layer()
+            nn.create_output_layer()
+        return nn
+
+    # pulse only the given output neurons, returning their values keyed by output key
+    def evaluate_heads(self, keys):
+        for key in keys:
+            assert key in self.outputs, "no such output neuron: " + str(key)
+        self.pulse(keys)
+        return dict([(key, self.outputs[key]) for key in keys])
 
     # print a representation of the neural net
     def print_me(self):
@@ -190,9 +284,19 @@ class NeuralNet(object):
 
 
 class GinNeuralNet(NeuralNet):
-    def __init__(self, observers, weightset):
+    # the output neurons each decision a strategy makes reads
+    decision_heads = {'start':                  ['action_start', 'index'],
+                      'end':                    ['action_end', 'index'],
+                      'accept_improper_knock':  ['accept_improper_knock']}
+
+    def __init__(self, observers, weightset, engine=None):
         output_keys = ['action_start', 'action_end', 'index', 'accept_improper_knock']
-        super(GinNeuralNet, self).__init__(observers, weightset, output_keys)
+        super(GinNeuralNet, self).__init__(observers, weightset, output_keys, engine=engine)
+
+    # pulse only the output neurons the given decision needs, returning their values keyed by output key
+    def evaluate_decision(self, decision):
+        assert decision in self.decision_heads, "unknown decision: " + str(decision)
+        return self.evaluate_heads(self.decision_heads[decision])
 
 
 class Perceptron(object):
@@ -206,6 +310,9 @@ class Perceptron(object):
         # memoization caching
         self.memo = False
 
+        # the sigmoid for the activation mode we were built under
+        self.activation = get_sigmoid()
+
     # uplink to an upstream perceptron, storing the connection's weight in a dict
     def add_input(self, target, weight):
         self.inputs[target] = weight
@@ -215,14 +322,10 @@ class Perceptron(object):
     def step_function(self):
         return sum(self.inputs.values())
 
+    # the exact sigmoid. generate_output() uses self.activation, which follows the activation mode (see activation.py)
     @staticmethod
     def sigmoid(num):
-        if -num > 100:
-            return 0
-        elif -num < -100:
-            return 1
-        else:
-            return 1 / (1 + exp(-num))
+        return sigmoid_exact(num)
 
     # return the sigmoid of: the sum of our inputs multiplied by their respective weights
     def generate_output(self, indent_level=0, getlast=True):
@@ -237,17 +340,22 @@ class Perceptron(object):
             if func_debug:
                 indent_print(indent_level, "running generate_output() for: " + self.id)
 
-            for each_input in self.inputs.keys():
+            for each_input, weight in self.inputs.iteritems():
                 output = each_input.generate_output(indent_level=indent_level+1, getlast=getlast)
-                weighted += self.inputs[each_input] * output
-                sigmoided = Perceptron.sigmoid(weighted)
+                weighted += weight * output
                 # debug output
                 if func_debug:
                     indent_print(indent_level+1, "looking at connection from " + each_input.id + " to " + self.id)
-                    indent_print(indent_level+2, "input weight: " + str(self.inputs[each_input]))
+                    indent_print(indent_level+2, "input weight: " + str(weight))
                     indent_print(indent_level+2, "output: " + str(output))
                     indent_print(indent_level+2, "weighted: " + str(weighted))
-                    indent_print(indent_level+2, "sigmoided: " + str(round(sigmoided, 4)))
+
+            # only the sum of all of our inputs gets squashed
+            if self.inputs:
+                sigmoided = self.activation(weighted)
+
+            if func_debug:
+                indent_print(indent_level+1, "sigmoided: " + str(round(sigmoided, 4)))
 
             self.memo = sigmoided
 
@@ -273,7 +381,7 @@ class InputPerceptron(Perceptron):
         func_debug = 0
 
         # ask the observer for its current sense of the world, weight it, and then run it through the sigmoid function
-        sigmoided = Perceptron.sigmoid(self.sense() * self.weight)
+        sigmoided = self.activation(self.sense() * self.weight)
 
         if func_debug:
             indent_print(indent_level, "running generate_output() for: " + self.id)
@@ -317,82 +425,155 @@ class BiasPerceptron(Perceptron):
         return self.bias
 
 
-# wrapper class for geneset that exposes the genes as an arrangement of weights
+# a view over a GeneSet's genes, which stay in one flat list: input weights, then hidden, jidden and output rows. each
+# layer is an offset, a shape and a row stride into the genes, so building (and pruning) one copies no genes at all.
+#
+# weights is the same data as a dict of nested lists. it is built the first time it's asked for, and from then on
+# it's what the WeightSet reads from, so changes made to those lists are seen by every network built afterwards.
 class WeightSet(object):
-    def __init__(self, gene_set, num_inputs=None, num_hidden=None, num_outputs=None):
+    layer_names = ('input', 'hidden', 'jidden', 'output')
+
+    # the layers are either given as (name, rows, columns) in gene order (see topology.py), or are the usual input,
+    # hidden, jidden and output layers for the given sizes
+    def __init__(self, gene_set, num_inputs=None, num_hidden=None, num_outputs=None, layers=None, topology=None):
         # ensure correct args
-        assert num_inputs is not None and num_hidden is not None and num_outputs is not None, "empty args"
-        assert len(gene_set.genes) >= num_inputs + num_hidden * num_inputs + num_outputs * num_hidden, \
-            "not enough genes to fill up our weights"
-
-        # create structure
-        self.weights = {'input': [], 'hidden': [], 'jidden': [], 'output': []}
-
-        gene_index = 0
-
-        # fill input layer with weights
-        for _ in range(num_inputs):
-            self.weights['input'].append(gene_set.genes[gene_index])
-            gene_index += 1
-
-        # fill hidden layer with weights connecting to input layer
-        for i in range(num_hidden):
-            self.weights['hidden'].append([])
-            for _ in range(num_inputs):
-                self.weights['hidden'][i].append(gene_set.genes[gene_index])
-                gene_index += 1
-
-        # fill jidden layer with weights connecting to hidden layer
-        for i in range(num_hidden):
-            self.weights['jidden'].append([])
-            for _ in range(num_hidden):
-                self.weights['jidden'][i].append(gene_set.genes[gene_index])
-                gene_index += 1
-
-        # fill output layer with weights connecting to input layer
-        for i in range(num_outputs):
-            self.weights['output'].append([])
-            for _ in range(num_hidden):
-                self.weights['output'][i].append(gene_set.genes[gene_index])
-                gene_index += 1
-
-    # cut out junk genes
+        if layers is None:
+            assert num_inputs is not None and num_hidden is not None and num_outputs is not None, "empty args"
+            assert len(gene_set.genes) >= num_inputs + num_hidden * num_inputs + num_outputs * num_hidden, \
+                "not enough genes to fill up our weights"
+            layers = [('input', 1, num_inputs), ('hidden', num_hidden, num_inputs),
+                      ('jidden', num_hidden, num_hidden), ('output', num_outputs, num_hidden)]
+        else:
+            assert len(gene_set.genes) >= sum([rows * columns for name, rows, columns in layers]), \
+                "not enough genes to fill up our weights"
+
+        self.genes = gene_set.genes
+        self.weight_lists = None
+
+        # the Topology we were laid out by, if any
+        self.topology = topology
+
+        # [offset, rows, columns, stride] per layer. the input layer is a single row.
+        self.layout = {}
+        offset = 0
+        for name, rows, columns in layers:
+            assert name in self.layer_names, "unknown layer: " + str(name)
+            self.layout[name] = [offset, rows, columns, columns]
+            offset += rows * columns
+
+    @property
+    def weights(self):
+        if self.weight_lists is None:
+            self.weight_lists = dict([(name, self.layer(name)) for name in self.names()])
+        return self.weight_lists
+
+    @weights.setter
+    def weights(self, weights):
+        self.weight_lists = weights
+
+    # the names of the layers we have weights for, in the order they're fed
+    def names(self):
+        if self.weight_lists is not None:
+            return [name for name in self.layer_names if name in self.weight_lists]
+        return [name for name in self.layer_names if name in self.layout]
+
+    # row i of a layer's weights, as a new list. the input layer has the one row.
+    def row(self, name, i):
+        if self.weight_lists is not None:
+            if name == 'input':
+                return list(self.weight_lists[name])
+            return list(self.weight_lists[name][i])
+
+        offset, rows, columns, stride = self.layout[name]
+        start = offset + i * stride
+        genes = self.genes[start:start + columns]
+        if isinstance(genes, list):
+            return genes
+        # an array of genes, e.g. a numpy array or one mapped from a file (see artifact.py)
+        return genes.tolist()
+
+    # a layer's weights as new lists: a flat list for the input layer, a list of rows for the others
+    def layer(self, name):
+        if name == 'input':
+            return self.row(name, 0)
+        if self.weight_lists is not None:
+            return [list(row) for row in self.weight_lists[name]]
+        return [self.row(name, i) for i in range(self.layout[name][1])]
+
+    # a layer's weights as a numpy array. when the genes are a numpy array this is a view on them rather than a copy.
+    def matrix(self, name, dtype=None):
+        if dtype is None:
+            dtype = numpy.float64
+        if self.weight_lists is not None:
+            return numpy.array(self.weight_lists[name], dtype=dtype)
+
+        offset, rows, columns, stride = self.layout[name]
+        genes = self.genes[offset:offset + rows * stride]
+        if isinstance(genes, array):
+            genes = numpy.frombuffer(genes, dtype=numpy.float64)
+        genes = numpy.asarray(genes, dtype=dtype)
+        if name == 'input':
+            return genes[:columns]
+        return genes.reshape(rows, stride)[:, :columns]
+
+    # the (rows, columns of each row) of a layer
+    def shape(self, name):
+        if self.weight_lists is not None:
+            layer = self.weight_lists[name]
+            if name == 'input':
+                return 1, [len(layer)]
+            return len(layer), [len(row) for row in layer]
+        offset, rows, columns, stride = self.layout[name]
+        return rows, [columns] * rows
+
+    # cut out junk genes. only the layout changes, the genes are left alone.
     def prune(self, num_inputs, num_hidden, num_outputs):
-        # input layer
-        self.weights['input'] = self.weights['input'][:num_inputs]
-
-        # hidden layer
-        self.weights['hidden'] = self.weights['hidden'][:num_hidden]
-        for i in range(len(self.weights['hidden'])):
-            self.weights['hidden'][i] = self.weights['hidden'][i][:num_inputs]
-
-        # output layer
-        self.weights['output'] = self.weights['output'][:num_inputs]
-        for i in range(len(self.weights['output'])):
-            self.weights['output'][i] = self.weights['output'][i][:num_hidden]
+        for name, rows, columns in (('input', 1, num_inputs), ('hidden', num_hidden, num_inputs),
+                                    ('jidden', num_hidden, num_hidden), ('output', num_outputs, num_hidden)):
+            if name in self.layout:
+                self.layout[name][1] = min(self.layout[name][1], rows)
+                self.layout[name][2] = min(self.layout[name][2], columns)
+
+        # lists we already handed out get cut down the same way
+        if self.weight_lists is not None:
+            self.weight_lists['input'] = self.weight_lists['input'][:num_inputs]
+            for name, rows, columns in (('hidden', num_hidden, num_inputs), ('jidden', num_hidden, num_hidden),
+                                        ('output', num_outputs, num_hidden)):
+                if name in self.weight_lists:
+                    self.weight_lists[name] = [row[:columns] for row in self.weight_lists[name][:rows]]
 
     def validate(self, expected_input_count, expected_hidden_count, expected_output_count):
         # ensure we have an input, hidden and output key
-        assert 'input'  in self.weights, "no input  weights"
-        assert 'hidden' in self.weights, "no hidden weights"
-        assert 'output' in self.weights, "no output weights"
+        names = self.names()
+        assert 'input'  in names, "no input  weights"
+        assert 'hidden' in names, "no hidden weights"
+        assert 'output' in names, "no output weights"
 
         # ensure we have exactly one input weight per expected
-        assert expected_input_count == len(self.weights['input']), "input weight mismatch"
+        assert [expected_input_count] == self.shape('input')[1], "input weight mismatch"
 
         # ensure we have exactly one hidden list per expected
-        assert expected_hidden_count == len(self.weights['hidden']), "hidden weight key mismatch"
+        rows, columns = self.shape('hidden')
+        assert expected_hidden_count == rows, "hidden weight key mismatch"
 
         # ensure each hidden list has length equal to number of input neurons
         for i in range(expected_hidden_count):
-            assert expected_input_count == len(self.weights['hidden'][i]), "hidden weight count mismatch"
+            assert expected_input_count == columns[i], "hidden weight count mismatch"
+
+        # the second hidden layer, when there is one, reads the first. the output layer reads the last.
+        last_hidden_count = expected_hidden_count
+        if 'jidden' in names:
+            last_hidden_count, columns = self.shape('jidden')
+            for i in range(last_hidden_count):
+                assert expected_hidden_count == columns[i], "jidden weight count mismatch"
 
         # ensure we have exactly one output list per output
-        assert expected_output_count == len(self.weights['output']), "output weight key mismatch"
+        rows, columns = self.shape('output')
+        assert expected_output_count == rows, "output weight key mismatch"
 
         # ensure each output list has length equal to number of hidden neurons
         for i in range(expected_output_count):
-            assert expected_hidden_count == len(self.weights['output'][i]), "output weight count mismatch"
+            assert last_hidden_count == columns[i], "output weight count mismatch"
 
         # as long as we made it this far, we're good
         return True
\ No newline at end of file
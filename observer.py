@@ -17,20 +17,24 @@ from utility import *
 # For future improvement (garbage collection), look towards: https://github.com/DanielSank/observed
 
 # decorator to be used on methods that affect the state of the game. subscribes the observer to all changes made
-#  to methods in the Observable class
+#  to methods in the Observable class. the data is organized once per change and handed to every observer as is.
 def notify_observers_after(func):
     def func_wrapper(self, *args, **kwargs):
         ret_value = func(self, *args, **kwargs)
-        for observer in self._observers:
-            observer.observe(self.organize_data())
+        if self._observers:
+            data = self.organize_data()
+            for observer in self._observers:
+                observer.observe(data)
         return ret_value
     return func_wrapper
 
 
 def notify_observers_before(func):
     def func_wrapper(self, *args, **kwargs):
-        for observer in self._observers:
-            observer.observe(self.organize_data())
+        if self._observers:
+            data = self.organize_data()
+            for observer in self._observers:
+                observer.observe(data)
         return func(self, *args, **kwargs)
 
     return func_wrapper
@@ -66,12 +70,13 @@ class Observer(object):
     def register(self, obj):
         obj.register_observer(self)
 
-    # store a copy of the integer dict passed our way
+    # keep the integer dict passed our way. nothing writes to it, so it's shared rather than copied. the buffer is
+    # replaced, never changed in place.
     def observe(self, int_dict):
         if not int_dict:
             self.buffer = None
         else:
-            self.buffer = dict(int_dict)
+            self.buffer = int_dict
 
     # return the ith member of the buffer. This is useful for assigning 10 neurons to the same Observer, each with id
     def get_value_by_index(self, index):
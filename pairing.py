@@ -0,0 +1,89 @@
+#!/usr/bin/python
+#
+# pairing.py
+#
+# 2026/10/18
+# rg
+#
+# pairing schedules: who plays whom in a fitness test. a schedule hands the Population its pairings a round at a
+# time, as lists of (challenger, defender) GeneSets, and each round is played and recorded before the next is asked
+# for, so a schedule can pair members by how they're doing.
+#
+# a round robin plays every pair, which is n(n-1)/2 matches and fine for a few dozen members. for several hundred,
+# sampling k opponents per member or a few Swiss rounds keeps a fitness test to O(nk) matches.
+
+import random
+
+
+# every member plays every other member once
+class RoundRobinSchedule(object):
+    def rounds(self, population):
+        members = population.member_genes.keys()
+        pairings = []
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pairings.append((members[i], members[j]))
+        yield pairings
+
+
+# every member challenges k opponents drawn at random, so each plays about 2k matches. no pair plays twice.
+class SampledSchedule(object):
+    def __init__(self, k=None):
+        if k is None:
+            k = 5
+        assert k > 0, "members must play at least one opponent"
+        self.k = k
+
+    def rounds(self, population):
+        members = population.member_genes.keys()
+        pairings = []
+        paired = set()
+        for i in range(len(members)):
+            opponents = random.sample(range(len(members) - 1), min(self.k, len(members) - 1))
+            for j in opponents:
+                # skip over the member itself
+                if j >= i:
+                    j += 1
+                if (i, j) not in paired and (j, i) not in paired:
+                    paired.add((i, j))
+                    pairings.append((members[i], members[j]))
+        yield pairings
+
+
+# a number of Swiss rounds: the first pairs members at random, each after that pairs members of similar standing (by
+# the Population's ranking) who haven't yet played each other. with an odd number of members, one sits out each round.
+class SwissSchedule(object):
+    def __init__(self, rounds=None):
+        if rounds is None:
+            rounds = 5
+        assert rounds > 0, "a Swiss schedule has at least one round"
+        self.round_count = rounds
+
+    def rounds(self, population):
+        members = population.member_genes.keys()
+        played = set()
+        for round_number in range(self.round_count):
+            if round_number == 0:
+                standings = list(members)
+                random.shuffle(standings)
+            else:
+                standings = sorted(members, key=lambda member: population.ranking_func(population.member_genes[member]),
+                                   reverse=True)
+
+            # pair each member with the next best one they haven't played, if there's one left
+            pairings = []
+            unpaired = standings
+            while len(unpaired) > 1:
+                challenger = unpaired[0]
+                for defender in unpaired[1:]:
+                    if (challenger, defender) not in played:
+                        break
+                else:
+                    unpaired = unpaired[1:]
+                    continue
+
+                played.add((challenger, defender))
+                played.add((defender, challenger))
+                pairings.append((challenger, defender))
+                unpaired = [member for member in unpaired if member is not challenger and member is not defender]
+            yield pairings
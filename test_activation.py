@@ -0,0 +1,46 @@
+import unittest
+from activation import *
+import activation
+
+
+class TestActivation(unittest.TestCase):
+    def tearDown(self):
+        set_mode('exact')
+
+    def test_set_mode(self):
+        set_mode('rational')
+        self.assertEqual('rational', activation.mode)
+        self.assertIs(sigmoid_rational, get_sigmoid())
+        self.assertIs(sigmoid_exact, get_sigmoid('exact'))
+
+        with self.assertRaises(AssertionError):
+            set_mode('cubic')
+
+    def test_sigmoid_exact(self):
+        self.assertEqual(0.5, sigmoid_exact(0))
+        self.assertEqual(0, sigmoid_exact(-101))
+        self.assertEqual(1, sigmoid_exact(101))
+
+    def test_measure_error(self):
+        # each mode stays within its documented error bound
+        for mode in MODES:
+            self.assertLessEqual(measure_error(mode, step=0.01), ERROR_BOUNDS[mode])
+
+        # the approximations are approximations
+        self.assertGreater(measure_error('table', step=0.01), 0)
+        self.assertGreater(measure_error('rational', step=0.01), 0)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_vector_sigmoids(self):
+        nums = numpy.linspace(-120, 120, 2401)
+        for mode in MODES:
+            sigmoided = get_vector_sigmoid(mode)(nums)
+            for i in range(len(nums)):
+                self.assertAlmostEqual(SIGMOIDS[mode](nums[i]), sigmoided[i], 12)
+
+    def test_measure_decision_divergence(self):
+        self.assertEqual(0, measure_decision_divergence('exact', genomes=1, pulses=20))
+
+        divergence = measure_decision_divergence('rational', genomes=1, pulses=20)
+        self.assertGreaterEqual(divergence, 0)
+        self.assertLessEqual(divergence, 1)
@@ -0,0 +1,83 @@
+import unittest
+import os
+from artifact import *
+from genetic_algorithm import *
+from test_neuralengine import EngineTestHelper
+
+
+class TestArtifact(EngineTestHelper):
+    def setUp(self):
+        super(TestArtifact, self).setUp()
+        self.path = '/tmp/test_artifact.bin'
+
+    def tearDown(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def test_export_artifact(self):
+        topology = Topology()
+        size = export_artifact(GeneSet(4000), topology, self.path)
+
+        # the header, the spec and just the genes the topology reads
+        self.assertEqual(size, os.path.getsize(self.path))
+        self.assertEqual(0, size % 8)
+        self.assertLess(size - 8 * topology.genome_length(), 256)
+
+        with self.assertRaises(AssertionError):
+            export_artifact(GeneSet(100), topology, self.path)
+
+    def test_load_artifact(self):
+        geneset = GeneSet(4000)
+        for topology in (Topology(), Topology(hidden=[10], activation_mode='table'), EncoderTopology()):
+            export_artifact(geneset, topology, self.path)
+            artifact = load_artifact(self.path)
+            self.assertEqual(ARTIFACT_VERSION, artifact.version)
+            self.assertEqual(topology, artifact.topology)
+            self.assertEqual(list(geneset.genes[:topology.genome_length()]), list(artifact.genes))
+
+            # the loaded network plays exactly like one built from the GeneSet
+            reference = topology.build(self.observers, geneset, 'graph')
+            for engine in ('graph', 'compiled') + (('numpy',) if numpy is not None else ()):
+                nn = artifact.build(self.observers, engine)
+                reference.pulse()
+                nn.pulse()
+                for key in reference.outputs:
+                    self.assertAlmostEqual(reference.outputs[key], nn.outputs[key], 10)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_load_artifact_mapped(self):
+        export_artifact(GeneSet(4000), Topology(), self.path)
+        artifact = load_artifact(self.path)
+
+        # the genes are read from the mapped file rather than copied, and can't be changed
+        self.assertFalse(artifact.genes.flags.owndata)
+        self.assertFalse(artifact.genes.flags.writeable)
+
+    def test_load_artifact_invalid(self):
+        export_artifact(GeneSet(4000), Topology(), self.path)
+        with open(self.path, 'r+b') as f:
+            f.write('NOTABRAN')
+        with self.assertRaises(AssertionError):
+            load_artifact(self.path)
+
+        # a newer format version than we know
+        export_artifact(GeneSet(4000), Topology(), self.path)
+        with open(self.path, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('<H', ARTIFACT_VERSION + 1))
+        with self.assertRaises(AssertionError):
+            load_artifact(self.path)
+
+    def test_strategy(self):
+        p = Population(None, 2, engine='compiled')
+        p.fitness_test()
+        p.export_champion(self.path)
+        artifact = load_artifact(self.path)
+
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        p1.strategy = artifact.strategy(p1, p2, match)
+        p2.strategy = artifact.strategy(p2, p1, match)
+        self.assertIn(match.run()['winner'], (p1, p2))
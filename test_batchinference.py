@@ -0,0 +1,73 @@
+import unittest
+from batchinference import *
+from genetic_algorithm import *
+from test_neuralengine import EngineTestHelper
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatchedInference(EngineTestHelper):
+    def setUp(self):
+        super(TestBatchedInference, self).setUp()
+        self.batcher = BatchedInference()
+
+    def test_register(self):
+        input_weights = self.reference.gather_input_weights()
+        other_weightset = WeightSet(GeneSet(4000), self.num_inputs, self.num_hidden, self.num_outputs)
+
+        # each key gets exactly one slot
+        self.assertEqual(0, self.batcher.register('a', self.weightset, input_weights))
+        self.assertEqual(1, self.batcher.register('b', other_weightset, input_weights))
+        self.assertEqual(0, self.batcher.register('a', self.weightset, input_weights))
+        self.assertEqual(2, len(self.batcher.engines))
+
+    def test_evaluate_batch(self):
+        input_weights = self.reference.gather_input_weights()
+        weightsets = [WeightSet(GeneSet(4000), self.num_inputs, self.num_hidden, self.num_outputs) for _ in range(3)]
+        for i in range(len(weightsets)):
+            self.batcher.register(i, weightsets[i], input_weights)
+
+        # a batch with repeated and out-of-order slots must match pulsing each network on its own
+        slots = [2, 0, 1, 0]
+        inputs = [[(i * 7 + j) % 53 for j in range(self.num_inputs)] for i in range(len(slots))]
+        outputs = self.batcher.evaluate_batch(slots, inputs)
+        for i in range(len(slots)):
+            expected = self.batcher.engines[slots[i]].evaluate(inputs[i])
+            for j in range(self.num_outputs):
+                self.assertAlmostEqual(expected[j], outputs[i][j], 10)
+
+    def test_submit(self):
+        # outside of run(), a pulse is evaluated right away and matches the Perceptron graph
+        nn = GinNeuralNet(self.observers, self.weightset, engine=self.batcher.engine_for('us'))
+        self.assert_same_outputs(nn)
+        self.change_state()
+        self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+    def test_run(self):
+        matches = []
+        for _ in range(6):
+            p1, p2 = GinPlayer(), GinPlayer()
+            match = GinMatch(p1, p2)
+            for us, them, key in ((p1, p2, 'p1'), (p2, p1, 'p2')):
+                observers = [Observer(us), Observer(match.table), Observer(match)]
+                nn = GinNeuralNet(observers, self.weightset, engine=self.batcher.engine_for(key))
+                us.strategy = NeuralGinStrategy(us, them, match, nn)
+            matches.append(match)
+
+        results = self.batcher.run(matches, concurrency=4)
+
+        # every match finishes with its own players, and pulses were evaluated in batches of several
+        self.assertEqual(len(matches), len(results))
+        for i in range(len(matches)):
+            self.assertIn(results[i]['winner'], (matches[i].p1, matches[i].p2))
+        self.assertGreater(self.batcher.pulses, self.batcher.batches)
+        self.assertEqual(0, self.batcher.active)
+
+    def test_fitness_test(self):
+        p = Population(4000, 4, engine='numpy', batched=True)
+        p.fitness_test()
+
+        matches_won = sum([stats['match_wins'] for stats in p.member_genes.values()])
+        matches_lost = sum([stats['match_losses'] for stats in p.member_genes.values()])
+        self.assertEqual(6, matches_won)
+        self.assertEqual(6, matches_lost)
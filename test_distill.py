@@ -0,0 +1,68 @@
+import unittest
+from distill import *
+from genetic_algorithm import *
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestDistill(unittest.TestCase):
+    def setUp(self):
+        self.teacher = GeneSet(Topology().genome_length())
+        self.student_topology = Topology(hidden=[8])
+
+    def test_record_games(self):
+        widths, output_keys, inputs, outputs = record_games(self.teacher, games=2)
+        self.assertEqual([11, 33, 5], widths)
+        self.assertEqual(len(inputs), len(outputs))
+        self.assertEqual((49, 4), (inputs.shape[1], outputs.shape[1]))
+
+        # the recorded outputs are what the teacher's network computes for the recorded inputs
+        expected = evaluate_genes(self.teacher, Topology(), widths, inputs[:5])
+        for i in range(5):
+            for j in range(4):
+                self.assertAlmostEqual(expected[i][j], outputs[i][j], 10)
+
+    def test_record_games_encoder(self):
+        # a teacher reading a card encoder is recorded with the observers' raw values, which a student can read
+        from encoder import EncoderTopology
+        topology = EncoderTopology()
+        teacher = GeneSet(topology.genome_length())
+        widths, output_keys, inputs, outputs = record_games(teacher, topology, games=2)
+        self.assertEqual([11, 33, 5], widths)
+        self.assertEqual(49, inputs.shape[1])
+
+        student, report = distill(teacher, topology, self.student_topology, games=2, epochs=5)
+        self.assertEqual(self.student_topology.genome_length(), len(student.genes))
+        self.assertIn('encoder-4', report['teacher'])
+
+    def test_fit_student(self):
+        widths, output_keys, inputs, outputs = record_games(self.teacher, games=2)
+        untrained = fit_student(widths, inputs, outputs, self.student_topology, epochs=1)
+        trained = fit_student(widths, inputs, outputs, self.student_topology, epochs=200)
+        self.assertEqual(self.student_topology.genome_length(), len(trained.genes))
+        self.assertLess(student_error(trained, self.student_topology, widths, inputs, outputs),
+                        student_error(untrained, self.student_topology, widths, inputs, outputs))
+
+        with self.assertRaises(AssertionError):
+            fit_student(widths, inputs, outputs, Topology())
+
+    def test_decision_agreement(self):
+        keys = ['action_start', 'action_end', 'index', 'accept_improper_knock']
+        self.assertEqual(1.0, decision_agreement(keys, [[0.1, 0.2, 0.3, 0.4]], [[0.2, 0.25, 0.31, 0.45]]))
+        self.assertEqual(0.5, decision_agreement(keys, [[0.1, 0.2, 0.3, 0.4]], [[0.9, 0.9, 0.31, 0.45]]))
+
+    def test_distill(self):
+        student, report = distill(self.teacher, student_topology=self.student_topology, games=2, epochs=50)
+        self.assertGreater(report['samples'], report['held_out'])
+        self.assertGreaterEqual(report['agreement'], 0)
+        self.assertLessEqual(report['agreement'], 1)
+        self.assertGreater(report['speedup'], 0)
+        self.assertIn('49-8-4', draw_distillation_report(report))
+
+        # the student plays as an ordinary strategy
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        players = ((p1, p2, student, self.student_topology), (p2, p1, self.teacher, Topology()))
+        for us, them, geneset, topology in players:
+            nn = topology.build([Observer(us), Observer(match.table), Observer(match)], geneset)
+            us.strategy = NeuralGinStrategy(us, them, match, nn)
+        self.assertIn(match.run()['winner'], (p1, p2))
@@ -0,0 +1,93 @@
+import unittest
+from distributed import *
+
+
+class TestCoordinator(unittest.TestCase):
+    def setUp(self):
+        self.coordinator = Coordinator(lease=0.5, idle=0.01)
+        self.coordinator.start()
+        self.workers = []
+
+    def tearDown(self):
+        self.coordinator.stop()
+        for worker in self.workers:
+            worker.join()
+
+    def start_workers(self, count):
+        for _ in range(count):
+            worker = multiprocessing.Process(target=run_worker, args=(self.coordinator.address(),))
+            worker.start()
+            self.workers.append(worker)
+
+    # take a unit as a worker would, without ever playing it
+    def take_unit(self):
+        connection = socket.create_connection(self.coordinator.address())
+        connection.sendall('{}\n')
+        reply = json.loads(connection.makefile('rb').readline())
+        return connection, reply
+
+    def test_fitness_test(self):
+        # local worker processes record the same results as playing each match here
+        p = Population(4000, 5, engine='compiled')
+        p.fitness_test()
+        self.start_workers(2)
+        results = []
+        for coordinator in (None, self.coordinator):
+            for geneset in p.member_genes:
+                p.add_member(geneset, 0)
+            p.coordinator = coordinator
+            random.seed(4)
+            p.fitness_test()
+            results.append([dict(stats) for stats in p.member_genes.values()])
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(10, sum([stats['match_wins'] for stats in results[1]]))
+
+        # the coordinator stays with its process
+        self.assertNotIn('coordinator', p.__getstate__())
+
+    def test_dropped_worker(self):
+        # a worker that drops out has its unit handed out again
+        p = Population(4000, 3, engine='compiled', coordinator=self.coordinator)
+        outcomes = []
+        thread = threading.Thread(target=lambda: outcomes.append(p.coordinator.play(p.work_config(), p.work_units(
+            [(geneset, geneset) for geneset in p.member_genes], [1, 2, 3]))))
+        thread.start()
+        while not self.coordinator.waiting:
+            time.sleep(0.01)
+
+        connection, reply = self.take_unit()
+        self.assertIn('unit', reply)
+        self.assertEqual('compiled', reply['config']['engine'])
+        connection.close()
+
+        # as does one that sits on it past its lease
+        connection, reply = self.take_unit()
+        self.start_workers(1)
+        thread.join()
+        connection.close()
+
+        self.assertEqual(3, len(outcomes[0]))
+        self.assertEqual(2, self.coordinator.reassigned)
+        for outcome in outcomes[0]:
+            self.assertIn(outcome['winner'], (0, 1))
+
+    def test_failing_worker(self):
+        # a worker that can't play a unit sends back the error and carries on, while the coordinator gives up on the
+        # job once a unit has been handed back more than retries times
+        p = Population(4000, 3, engine='compiled')
+        units = p.work_units([(geneset, geneset) for geneset in p.member_genes], [1, 2, 3])
+        config = p.work_config()
+        config['engine'] = 'missing'
+        self.start_workers(1)
+        with self.assertRaises(AssertionError):
+            self.coordinator.play(config, units)
+        self.assertEqual(3 + 1, max(self.coordinator.handed_back.values()))
+
+        # the same worker plays the next job
+        self.assertEqual(3, len(self.coordinator.play(p.work_config(), units)))
+        self.assertTrue(self.workers[0].is_alive())
+
+        # 'auto' is picked by the coordinating Population, so every worker uses the same engine
+        p = Population(4000, 1)
+        self.assertEqual(select_engine(p.topology), p.work_config()['engine'])
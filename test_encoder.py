@@ -0,0 +1,95 @@
+import unittest
+from encoder import *
+from genetic_algorithm import *
+from test_neuralengine import EngineTestHelper
+
+
+class TestCardEncoder(EngineTestHelper):
+    def setUp(self):
+        super(TestCardEncoder, self).setUp()
+        self.topology = EncoderTopology()
+        self.geneset = GeneSet(self.topology.genome_length())
+        self.encoder = CardEncoder(self.observers, self.topology.encoder_table(self.geneset))
+
+    def test___init__(self):
+        self.assertEqual(3 * 4 + 1 + 5, self.encoder.width)
+        with self.assertRaises(AssertionError):
+            CardEncoder(self.observers[:2], self.encoder.table)
+
+    def test_encode(self):
+        # the hand's features are the sum of its cards' rows
+        hand = self.observers[0].buffer
+        for i in range(self.encoder.encoding):
+            expected = sum([self.encoder.table[hand[slot]][i] for slot in range(11)])
+            self.assertAlmostEqual(expected, self.encoder.get_value_by_index(i), 10)
+
+        # the match's values pass straight through
+        self.match.p1_score = 17
+        self.match.noop_notify()
+        self.assertEqual(17, self.encoder.get_value_by_index(3 * self.encoder.encoding + 1 + 1))
+
+    # the features in the encoder's top-of-the-discard-pile and older discards slots, and its deck height
+    def discard_features(self):
+        encoding = self.encoder.encoding
+        values = [self.encoder.get_value_by_index(i) for i in range(self.encoder.width)]
+        return values[encoding:2 * encoding], values[2 * encoding:3 * encoding], values[3 * encoding]
+
+    def test_encode_discards(self):
+        # with nothing discarded, there's no top card and the deck's height is its own input
+        table = self.match.table
+        top, older, height = self.discard_features()
+        self.assertEqual([0.0] * self.encoder.encoding, top)
+        self.assertEqual([0.0] * self.encoder.encoding, older)
+        self.assertEqual(len(table.deck.cards), height)
+
+        # the top card is the last one discarded, the one a player can pick up
+        cards = [table.deal_a_card() for _ in range(3)]
+        for card in cards:
+            table.add_card_to_discard_pile(card)
+        top, older, height = self.discard_features()
+        self.assertEqual(self.encoder.table[cards[-1].ranking()], top)
+        for i in range(self.encoder.encoding):
+            self.assertAlmostEqual(sum([self.encoder.table[card.ranking()][i] for card in cards[:-1]]), older[i], 10)
+        self.assertEqual(len(table.deck.cards), height)
+
+    def test_get_value_by_index(self):
+        # values are only encoded again once an observer sees something new
+        self.encoder.get_value_by_index(0)
+        values = self.encoder.values
+        self.encoder.get_value_by_index(1)
+        self.assertIs(values, self.encoder.values)
+
+        self.change_state()
+        self.encoder.get_value_by_index(0)
+        self.assertIsNot(values, self.encoder.values)
+
+
+class TestEncoderTopology(EngineTestHelper):
+    def test_genome_length(self):
+        topology = EncoderTopology()
+        self.assertEqual(18 + 12 * 18 + 4 * 12 + 53 * 4, topology.genome_length())
+        self.assertLess(topology.genome_length() * 6, Topology().genome_length())
+
+    def test_build(self):
+        topology = EncoderTopology()
+        geneset = GeneSet(topology.genome_length())
+        reference = topology.build(self.observers, geneset, 'graph')
+        nn = topology.build(self.observers, geneset, 'compiled')
+        for _ in range(3):
+            reference.pulse()
+            nn.pulse()
+            for key in reference.outputs:
+                self.assertAlmostEqual(reference.outputs[key], nn.outputs[key], 10)
+            self.change_state()
+
+        # attaching to another player's observers encodes theirs, with the same table
+        observers = [Observer(self.p2), Observer(self.match.table), Observer(self.match)]
+        attached = topology.attach(nn, observers)
+        self.assertIs(observers, attached.observers[0].observers)
+        self.assertIs(nn.observers[0].table, attached.observers[0].table)
+
+    def test_fitness_test(self):
+        p = Population(None, 3, engine='compiled', topology=EncoderTopology())
+        self.assertEqual(494, len(p.member_genes.keys()[0].genes))
+        p.fitness_test()
+        self.assertEqual(3, sum([stats['match_wins'] for stats in p.member_genes.values()]))
@@ -1,6 +1,7 @@
 import unittest
 from genetic_algorithm import *
 import utility
+import copy
 import os
 
 # static seed for repeatability
@@ -106,6 +107,43 @@ class TestGeneSet(unittest.TestCase):
         with self.assertRaises(AssertionError):
             self.mutate_with_size_and_probability(1000, 0.0)
 
+    def test_breed_without_numpy(self):
+        # without numpy, genes are crossed and mutated one at a time
+        mom, dad = GeneSet(100), GeneSet(50)
+        import genetic_algorithm
+        saved, genetic_algorithm.numpy = genetic_algorithm.numpy, None
+        try:
+            kid = mom.cross(dad)
+            kid.mutate(1)
+        finally:
+            genetic_algorithm.numpy = saved
+        self.assertIsInstance(kid.genes, array)
+        self.assertEqual(100, len(kid.genes))
+        self.assertNotEqual(list(mom.genes), list(kid.genes))
+
+    def test_pickle(self):
+        # genes pickle as a string of bytes, smaller than a list of floats and far smaller than the text pickle
+        gs = GeneSet(1000)
+        pickled = pickle.dumps(gs, pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(pickled), len(pickle.dumps(list(gs.genes), pickle.HIGHEST_PROTOCOL)))
+        self.assertLess(len(pickled), len(pickle.dumps(list(gs.genes))) / 2)
+        restored = pickle.loads(pickled)
+        self.assertIsInstance(restored.genes, array)
+        self.assertEqual(list(gs.genes), list(restored.genes))
+
+        # GeneSets pickled with a list of genes still load
+        old = GeneSet.__new__(GeneSet)
+        old.__setstate__({'genes': [0.1, 0.2, 0.3]})
+        self.assertEqual([0.1, 0.2, 0.3], list(old.genes))
+
+    def test_breed_time(self):
+        # a child of two large genomes is bred in well under a millisecond
+        mom, dad = GeneSet(5000), GeneSet(5000)
+        started = time.time()
+        for _ in range(100):
+            mom.cross(dad).mutate(0.075)
+        self.assertLess((time.time() - started) / 100, 0.002)
+
 
 class TestGinGeneSet(unittest.TestCase):
     def setUp(self):
@@ -183,6 +221,21 @@ class TestPopulation(unittest.TestCase):
         self.assertEqual(self.initial_population_size, len(self.p.member_genes))
         self.assertEqual(self.gene_size, len(self.p.member_genes.keys()[0].genes))
 
+        # an engine with options is stored with the population
+        self.p.engine = sparse_engine(0.25)
+        self.assertTrue(self.p.persist(action='store'))
+        self.p.engine = None
+        self.p.persist(action='load')
+        self.assertEqual({'threshold': 0.25}, self.p.engine.options)
+
+        # a store that fails leaves the last one intact
+        self.p.engine = lambda weightset, input_weights: None
+        self.assertFalse(self.p.persist(action='store'))
+        self.assertFalse(os.path.exists(filename + '.tmp'))
+        self.p.current_generation = 0
+        self.assertTrue(self.p.persist(action='load'))
+        self.assertEqual(25, self.p.current_generation)
+
     def test_ranking_func(self):
         gene_item = {'game_wins': 4, 'coinflip_game_wins': 4, 'game_losses': 0, 'generation': 0, 'game_points': 40}
         self.assertEqual(-2500, self.p.ranking_func(gene_item))
@@ -260,6 +313,89 @@ class TestPopulation(unittest.TestCase):
         self.assertEqual(expected_games_played, matches_won)
         self.assertEqual(expected_games_played, matches_lost)
 
+        # each member's decisions went through its cache
+        self.assertGreater(self.p.cache_stats['misses'], 0)
+        self.assertLessEqual(self.p.cache_stats['hit_rate'], 1)
+
+    def test_fitness_test_builds_once(self):
+        # each member's network is built once per generation, however many matches it plays
+        built = []
+
+        def engine(weightset, input_weights):
+            built.append(weightset)
+            return CompiledEngine(weightset, input_weights)
+
+        self.p = Population(4000, 4, engine=engine)
+        self.p.fitness_test()
+        members = [geneset.genes for geneset in self.p.member_genes]
+        self.assertEqual(4, len([weightset for weightset in built if weightset.genes in members]))
+        self.assertEqual(6, sum([stats['match_wins'] for stats in self.p.member_genes.values()]))
+
+    def test_fitness_test_processes(self):
+        # worker processes play each pairing under the same seed as the serial run, so they record the same results
+        # and leave the same random state behind
+        p = Population(4000, 5, engine='compiled')
+        p.fitness_test()    # measuring the topology's cost draws random numbers the first time
+        results, following, decisions = [], [], []
+        for processes in (1, 3):
+            for geneset in p.member_genes:
+                p.add_member(geneset, 0)
+            p.processes = processes
+            p.cache_stats = None
+            random.seed(4)
+            p.fitness_test()
+            results.append([dict(stats) for stats in p.member_genes.values()])
+            following.append(random.random())
+            decisions.append(p.cache_stats['hits'] + p.cache_stats['misses'])
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(following[0], following[1])
+        self.assertEqual(10, sum([stats['match_wins'] for stats in results[1]]))
+
+        # the workers' decision caches are tallied too: the same decisions were made, wherever they were cached
+        self.assertGreater(decisions[1], 0)
+        self.assertEqual(decisions[0], decisions[1])
+
+        with self.assertRaises(AssertionError):
+            Population(4000, 2, batched=True, processes=2)
+
+        # one pool of workers plays every round of a fitness test
+        pools = []
+        original_pool = multiprocessing.Pool
+
+        def counting_pool(*args, **kwargs):
+            pools.append(original_pool(*args, **kwargs))
+            return pools[-1]
+        p = Population(4000, 6, engine='compiled', processes=2, schedule=SwissSchedule(3))
+        multiprocessing.Pool = counting_pool
+        try:
+            p.fitness_test()
+        finally:
+            multiprocessing.Pool = original_pool
+        self.assertEqual(1, len(pools))
+        matches = p.topology_costs.values()[0]['matches']
+        self.assertGreater(matches, 3)
+        self.assertEqual(matches, sum([stats['match_wins'] for stats in p.member_genes.values()]))
+
+    def test_play_round_restores_random_state(self):
+        # a match that fails still leaves the random state as it found it
+        p = Population(4000, 2, engine='compiled')
+        pairing = tuple(p.member_genes.keys())
+
+        def fail(*args):
+            random.random()
+            raise ValueError("failed")
+        p.build_match = fail
+        random.seed(4)
+        random.getrandbits(32)
+        expected = random.getstate()
+
+        # only the pairing's seed is drawn
+        random.seed(4)
+        with self.assertRaises(ValueError):
+            p.play_round([pairing], {}, {})
+        self.assertEqual(expected, random.getstate())
+
     def test_generate_next_generation(self):
         self.gene_size = 4000
         self.initial_population_size = 6
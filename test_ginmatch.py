@@ -61,6 +61,16 @@ class TestGinMatch(Helper):
         except Exception:
             self.fail("Ginmatch() raised Exception unexpectedly!")
 
+    def test_observers_for(self):
+        p1_observers = self.gm.observers_for(self.p1)
+        p2_observers = self.gm.observers_for(self.p2)
+
+        # each player has its own hand observer, and shares the table and match observers
+        self.assertIsNot(p1_observers[0], p2_observers[0])
+        self.assertEqual(p1_observers[1:], p2_observers[1:])
+        self.assertEqual([11, 33, 5], [observer.width for observer in p1_observers])
+        self.assertEqual(1, len([observer for observer in self.gm.table._observers if observer in p1_observers]))
+
     def test_knock(self):
         self.gm.deal_cards()
         self.assertEqual(11, self.p1.hand.size())
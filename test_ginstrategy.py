@@ -116,4 +116,53 @@ class TestNeuralGinStrategy(Helper):
 
     def test_determine_best_action(self):
         # we test most of this in the above two tests
-        pass
\ No newline at end of file
+        pass
+
+    def test_decision_cache(self):
+        self.nn.outputs.update({'action_start': 0.9, 'action_end': 0.5, 'index': 0.34})
+        self.strat.cache = DecisionCache()
+
+        # the same inputs and phase are only pulsed once
+        self.assertEqual(['DRAW', 3], self.strat.determine_best_action('start'))
+        self.assertEqual(['DRAW', 3], self.strat.determine_best_action('start'))
+        self.assertEqual(1, self.nn.pulses)
+        self.assertEqual(0.5, self.strat.cache.hit_rate())
+
+        # another phase or other inputs are decided afresh
+        self.assertEqual(['DISCARD', 3], self.strat.determine_best_action('end'))
+        self.nn.inputs = [1] * 49
+        self.assertEqual(['DRAW', 3], self.strat.determine_best_action('start'))
+        self.assertTrue(self.strat.consider_accepting_improper_knock())
+        self.assertTrue(self.strat.consider_accepting_improper_knock())
+        self.assertEqual(4, self.nn.pulses)
+        self.assertEqual((2, 4), (self.strat.cache.hits, self.strat.cache.misses))
+
+
+class TestDecisionCache(unittest.TestCase):
+    def test_lookup(self):
+        cache = DecisionCache(size=2)
+        self.assertIsNone(cache.lookup([1, 2], 'start'))
+
+        cache.store([1, 2], 'start', ('DRAW', 3))
+        self.assertEqual(('DRAW', 3), cache.lookup([1, 2], 'start'))
+        self.assertIsNone(cache.lookup([1, 2], 'end'))
+
+        # falsy decisions are cached too, and the oldest decisions are dropped
+        cache.store([3], 'accept_improper_knock', False)
+        self.assertIs(False, cache.lookup([3], 'accept_improper_knock'))
+        cache.store([4], 'end', ('KNOCK', 0))
+        self.assertIsNone(cache.lookup([1, 2], 'start'))
+        self.assertEqual(0.4, cache.hit_rate())
+
+    def test_lookup_collision(self):
+        # a state whose hash collides with a cached one's misses, rather than taking its decision
+        cache = DecisionCache()
+        original_make_key = DecisionCache.make_key
+        DecisionCache.make_key = staticmethod(lambda state: 0)
+        try:
+            cache.store([1, 2], 'start', ('DRAW', 3))
+            self.assertIsNone(cache.lookup([2, 1], 'start'))
+            self.assertEqual(('DRAW', 3), cache.lookup([1, 2], 'start'))
+        finally:
+            DecisionCache.make_key = staticmethod(original_make_key)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
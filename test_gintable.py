@@ -66,6 +66,11 @@ class TestGinTable(unittest.TestCase):
         self.assertTrue(min(found.keys()) >= 0)
         self.assertTrue(max(found.keys()) <= 52)
 
+        # the deck's height comes first, then the discards from the oldest to the one on top
+        self.assertEqual(len(self.t.deck.cards), data[0])
+        self.assertEqual([card.ranking() for card in self.t.discard_pile], [data[i] for i in range(1, 4)])
+        self.assertEqual(0, data[4])
+
     def test_deal_a_card(self):
         card = self.t.deal_a_card()
         self.assertIsInstance(card, GinCard)
@@ -0,0 +1,50 @@
+import unittest
+from genetic_algorithm import *
+
+
+class TestHeadToHead(unittest.TestCase):
+    def setUp(self):
+        self.a, self.b, self.c = GeneSet(40), GeneSet(40), GeneSet(40)
+        self.store = HeadToHead(2)
+
+    def test_fingerprint(self):
+        # the same genes make the same fingerprint
+        self.assertEqual(self.store.fingerprint(self.a), self.store.fingerprint(GeneSet(list(self.a.genes))))
+        self.assertNotEqual(self.store.fingerprint(self.a), self.store.fingerprint(self.b))
+        self.assertEqual(self.store.key((self.a, self.b)), self.store.key((self.b, self.a)))
+
+    def test_needed(self):
+        # a pair plays until it reaches the target, whichever way round it's paired
+        self.assertEqual([(self.a, self.b)] * 2 + [(self.a, self.c)] * 2,
+                         self.store.needed([(self.a, self.b), (self.a, self.c)]))
+        self.store.record((self.a, self.b), {'winner': 0})
+        self.assertEqual([(self.b, self.a)], self.store.needed([(self.b, self.a)]))
+        self.store.record((self.b, self.a), {'winner': 0})
+        self.assertEqual([], self.store.needed([(self.a, self.b)]))
+        self.assertEqual(1 + 2, self.store.skipped)
+
+        record = self.store.records[self.store.key((self.a, self.b))]
+        self.assertEqual(2, record['matches'])
+        self.assertEqual({self.store.fingerprint(self.a): 1, self.store.fingerprint(self.b): 1}, record['wins'])
+
+        # only the members kept are remembered
+        self.store.record((self.a, self.c), {'winner': 1})
+        self.store.retain([self.a, self.b])
+        self.assertEqual(2, self.store.matches((self.a, self.b)))
+        self.assertEqual(0, self.store.matches((self.a, self.c)))
+
+    def test_fitness_test(self):
+        p = Population(4000, 4, engine='compiled', retain_best=2, head_to_head=HeadToHead())
+        p.fitness_test()
+        p.fitness_test()
+
+        # the second fitness test had nothing left to play
+        costs = p.topology_costs.values()[0]
+        self.assertEqual(6, costs['matches'])
+        self.assertEqual(6, sum([stats['match_wins'] for stats in p.member_genes.values()]))
+
+        # after breeding, the survivors don't play each other again
+        p.cull()
+        p.cross_over(2)
+        p.fitness_test()
+        self.assertEqual(6 + 4 * 3 / 2 - 1, costs['matches'])
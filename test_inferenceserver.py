@@ -0,0 +1,92 @@
+import unittest
+import os
+from inferenceserver import *
+from genetic_algorithm import *
+from ginmatch import *
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.path = '/tmp/test_inferenceserver.sock'
+        self.artifact_path = '/tmp/test_inferenceserver.bin'
+        self.geneset = GeneSet(4000)
+        self.server = InferenceServer(self.path, max_wait=0.05)
+        for name, topology in (('dense', Topology()), ('encoder', EncoderTopology())):
+            export_artifact(self.geneset, topology, self.artifact_path)
+            self.server.load(name, self.artifact_path)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        os.remove(self.artifact_path)
+
+    def test_decide(self):
+        # the server decides just as a local strategy over the same network does
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        for _ in range(11):
+            p1.draw()
+        client = InferenceClient(self.path)
+        for name, topology in (('dense', Topology()), ('encoder', EncoderTopology())):
+            local = NeuralGinStrategy(p1, p2, match, topology.build(match.observers_for(p1), self.geneset))
+            remote = RemoteGinStrategy(p1, p2, match, client, name)
+            for phase in ('start', 'end'):
+                self.assertEqual(local.determine_best_action(phase), remote.determine_best_action(phase))
+            self.assertEqual(local.consider_accepting_improper_knock(), remote.consider_accepting_improper_knock())
+
+        # bad requests are refused without upsetting the server
+        with self.assertRaises(AssertionError):
+            client.decide('missing', 'start', remote.state())
+        with self.assertRaises(AssertionError):
+            client.decide('dense', 'start', [[1, 2, 3]])
+        state = remote.state()
+        state[0][0] = 1.5
+        with self.assertRaises(AssertionError):
+            client.decide('encoder', 'start', state)
+        self.assertIn(client.decide('dense', 'start', remote.state())[0], NeuralGinStrategy.actions['start'])
+
+        # as is a request its network fails on
+        def fail(requests):
+            raise TypeError("failed")
+        self.server.networks['encoder'].decide = fail
+        with self.assertRaises(AssertionError):
+            client.decide('encoder', 'start', remote.state())
+        self.assertIn(client.decide('dense', 'start', remote.state())[0], NeuralGinStrategy.actions['start'])
+        client.close()
+
+    def test_batching(self):
+        # requests arriving together are answered in one pass
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        for _ in range(10):
+            p1.draw()
+        state = RemoteGinStrategy(p1, p2, match, None, 'dense').state()
+        decisions = []
+
+        def request():
+            client = InferenceClient(self.path)
+            decisions.append(client.decide('dense', 'start', state))
+            client.close()
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(8, len(decisions))
+        self.assertEqual(1, len(set([tuple(decision) for decision in decisions])))
+        self.assertEqual(8, self.server.served)
+        self.assertLess(self.server.batches, 8)
+
+    def test_match(self):
+        # a whole match played through the server, where there's never another request to wait for
+        self.server.max_wait = 0.001
+        p1, p2 = GinPlayer(), GinPlayer()
+        match = GinMatch(p1, p2)
+        client = InferenceClient(self.path)
+        p1.strategy = RemoteGinStrategy(p1, p2, match, client, 'dense')
+        p2.strategy = RemoteGinStrategy(p2, p1, match, client, 'encoder')
+        match.run()
+        self.assertGreater(self.server.served, 0)
+        client.close()
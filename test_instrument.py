@@ -0,0 +1,78 @@
+import unittest
+import instrument
+from instrument import *
+from test_neuralengine import EngineTestHelper
+
+
+class TestInstrument(EngineTestHelper):
+    def tearDown(self):
+        instrument.disable()
+
+    def test_enable(self):
+        # nothing is patched until enabled, and everything is put back after
+        pulse = NeuralNet.__dict__['pulse']
+        instrumentation = instrument.enable()
+        self.assertIs(instrumentation, instrument.enable())
+        self.assertIsNot(pulse, NeuralNet.__dict__['pulse'])
+        self.assertIs(instrumentation, instrument.disable())
+        self.assertIs(pulse, NeuralNet.__dict__['pulse'])
+        self.assertIsNone(instrument.active)
+
+        # the outputs are the same either way
+        self.reference.pulse()
+        expected = dict(self.reference.outputs)
+        instrument.enable()
+        self.reference.pulse()
+        self.assertEqual(expected, self.reference.outputs)
+
+    def test_graph(self):
+        instrumentation = instrument.enable()
+        self.reference.pulse()
+        self.reference.pulse(['index'])
+        stats = instrumentation.networks[self.weightset]
+        self.assertEqual(2, stats.pulses)
+        self.assertEqual(set(['input', 'hidden', 'jidden', 'output']), set(stats.seconds.keys()))
+
+        # every jidden neuron reads each hidden neuron, and every output neuron each jidden neuron, but each computes
+        # only once per pulse: the rest are memo hits
+        hidden = self.num_hidden
+        self.assertEqual(2 * hidden * (hidden - 1) + (4 - 1) * hidden, stats.memo_hits)
+        self.assertEqual(2 * (2 * hidden) + 4 + 1, stats.memo_misses)
+
+        # input neurons aren't memoized, so each hidden neuron squashes every input again
+        inputs = 2 * hidden * self.num_inputs
+        self.assertEqual(inputs + stats.memo_misses, stats.sigmoid_calls)
+
+    def test_engine(self):
+        instrumentation = instrument.enable()
+        nn = GinNeuralNet(self.observers, self.weightset, engine='compiled')
+        nn.pulse()
+        nn.pulse(['index'])
+
+        # a network attached to other observers shares its WeightSet, and its counts
+        nn.attach(self.observers).pulse()
+        stats = instrumentation.networks[self.weightset]
+        self.assertEqual(3, stats.pulses)
+        self.assertEqual(['engine'], stats.seconds.keys())
+        self.assertEqual(3 * (self.num_inputs + 2 * self.num_hidden) + 4 + 1 + 4, stats.sigmoid_calls)
+
+    def test_fitness_test(self):
+        instrumentation = instrument.enable()
+        p = Population(None, 3, engine='compiled', topology=Topology(hidden=[8]))
+        p.fitness_test()
+        p.fitness_test()
+
+        self.assertEqual(2, len(instrumentation.generations))
+        generation = instrumentation.generations[-1]
+        self.assertEqual(3, generation['networks'])
+        self.assertGreater(generation['pulses'], 0)
+        self.assertGreater(generation['hand_calls'], 0)
+        self.assertLess(generation['inference_seconds'] + generation['hand_seconds'], generation['seconds'])
+        self.assertIn('inference share', draw_generation_report(instrumentation))
+        self.assertIn('us per pulse', draw_network_report(instrumentation))
+
+        # matches played in other processes can't be counted, so they aren't played
+        p.processes = 2
+        with self.assertRaises(AssertionError):
+            p.fitness_test()
+        self.assertEqual(2, len(instrumentation.generations))
@@ -0,0 +1,337 @@
+import unittest
+from neuralengine import *
+from neuralnet import *
+from observer import *
+from ginplayer import *
+from ginmatch import *
+from genetic_algorithm import GeneSet
+
+
+# build a match with a GinNeuralNet per engine, all sharing one set of observers
+class EngineTestHelper(unittest.TestCase):
+    num_inputs = 11 + 33 + 5
+    num_hidden = int((num_inputs + 4) * (2.0 / 3.0))
+    num_outputs = 4
+
+    def setUp(self):
+        self.p1 = GinPlayer()
+        self.p2 = GinPlayer()
+        self.match = GinMatch(self.p1, self.p2)
+        for _ in range(10):
+            self.p1.draw()
+        self.observers = [Observer(self.p1), Observer(self.match.table), Observer(self.match)]
+        self.weightset = WeightSet(GeneSet(4000), self.num_inputs, self.num_hidden, self.num_outputs)
+        self.reference = GinNeuralNet(self.observers, self.weightset)
+
+    # pulse both nets and ensure every output agrees with the Perceptron graph
+    def assert_same_outputs(self, nn):
+        self.reference.pulse()
+        nn.pulse()
+        for key in self.reference.outputs:
+            self.assertAlmostEqual(self.reference.outputs[key], nn.outputs[key], 10)
+
+    # pulse only each decision's output neurons and ensure they agree with a full pulse of the Perceptron graph
+    def assert_same_heads(self, nn):
+        self.reference.pulse()
+        for decision in GinNeuralNet.decision_heads:
+            heads = nn.evaluate_decision(decision)
+            for key in heads:
+                self.assertAlmostEqual(self.reference.outputs[key], heads[key], 10)
+
+    # change the state of the world a bit: a draw, a discard and a knock-worthy score
+    def change_state(self):
+        self.p1.draw()
+        self.p1.discard_card(self.p1.hand.get_card_at_index(3))
+        self.match.p1_score += 25
+        self.match.noop_notify()
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestNumpyEngine(EngineTestHelper):
+    def test___init__(self):
+        engine = NumpyEngine(self.weightset, self.reference.gather_input_weights())
+        self.assertEqual((self.num_inputs,), engine.input_weights.shape)
+        self.assertEqual([(self.num_hidden, self.num_inputs), (self.num_hidden, self.num_hidden),
+                          (self.num_outputs, self.num_hidden)], [layer.shape for layer in engine.layers])
+
+    def test_activation_mode(self):
+        # an engine built under another activation mode keeps using it
+        activation.set_mode('table')
+        try:
+            nn = GinNeuralNet(self.observers, self.weightset, engine='numpy')
+        finally:
+            activation.set_mode('exact')
+        self.assertIs(activation.vector_sigmoid_table, nn.engine.sigmoid)
+
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine='numpy')
+        self.assertEqual([], nn.input_layer)
+        self.assert_same_outputs(nn)
+
+        # outputs must keep matching as the observers see new data
+        for _ in range(3):
+            self.change_state()
+            self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestEmbeddingEngine(EngineTestHelper):
+    def test___init__(self):
+        engine = EmbeddingEngine(self.weightset, self.reference.gather_input_weights())
+        self.assertEqual((self.num_inputs, EmbeddingEngine.table_size, self.num_hidden), engine.tables.shape)
+
+        # a table entry is the input neuron's output times its weights into the hidden layer
+        activation = Perceptron.sigmoid(17 * engine.input_weights[5])
+        for h in range(self.num_hidden):
+            self.assertAlmostEqual(activation * engine.layers[0][h][5], engine.tables[5][17][h], 12)
+
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine='embedding')
+        self.assert_same_outputs(nn)
+        for _ in range(3):
+            self.change_state()
+            self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+        # values beyond the tables fall back to computing the input neuron
+        self.match.p1_score = 250
+        self.match.noop_notify()
+        self.assert_same_outputs(nn)
+
+
+class TestDeltaEngine(EngineTestHelper):
+    def test_propagate(self):
+        engine = DeltaEngine(self.weightset, self.reference.gather_input_weights())
+        engine.evaluate(self.reference.gather_inputs())
+
+        # the kept sums must match a full recompute after each round of changes
+        for _ in range(5):
+            self.change_state()
+            inputs = self.reference.gather_inputs()
+            engine.evaluate(inputs)
+            incremental = list(engine.sums)
+            engine.recompute(inputs)
+            for i in range(len(incremental)):
+                self.assertAlmostEqual(engine.sums[i], incremental[i], 10)
+
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine='delta')
+        self.assert_same_outputs(nn)
+        for _ in range(5):
+            self.change_state()
+            self.assert_same_outputs(nn)
+
+        # only the first pulse was a full recompute
+        self.assertEqual(6, nn.engine.pulses)
+        self.assert_same_heads(nn)
+
+
+class TestCompiledEngine(EngineTestHelper):
+    def test_generate_source(self):
+        source = CompiledEngine.generate_source([0.5, -0.25], [[[1.5, 2.0]], [[-3.0]]])
+        expected = ['def evaluate(inputs, rows=None):',
+                    '    x0, x1, = inputs',
+                    '    a0 = sigmoid(x0 * 0.5)',
+                    '    a1 = sigmoid(x1 * -0.25)',
+                    '    l0_0 = sigmoid(a0 * 1.5 + a1 * 2.0 + 1)',
+                    '    if rows is None:',
+                    '        rows = [0]',
+                    '    outputs = []',
+                    '    for row in rows:',
+                    '        if row == 0:',
+                    '            outputs.append(sigmoid(l0_0 * -3.0 + 1))',
+                    '    return outputs']
+        self.assertEqual('\n'.join(expected) + '\n', source)
+
+    def test_cache(self):
+        # a second network over the same weights reuses the compiled function
+        input_weights = self.reference.gather_input_weights()
+        first = CompiledEngine(self.weightset, input_weights)
+        second = CompiledEngine(self.weightset, input_weights)
+        self.assertIs(first.function, second.function)
+
+        other_weightset = WeightSet(GeneSet(4000), self.num_inputs, self.num_hidden, self.num_outputs)
+        self.assertIsNot(first.function, CompiledEngine(other_weightset, input_weights).function)
+
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine='compiled')
+        self.assert_same_outputs(nn)
+        for _ in range(3):
+            self.change_state()
+            self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+
+@unittest.skipIf(numba is None, "numba is not installed")
+class TestJitEngine(EngineTestHelper):
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine='jit')
+        self.assert_same_outputs(nn)
+        self.change_state()
+        self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+
+class TestEngineRegistry(EngineTestHelper):
+    def test_register_engine(self):
+        self.assertIn('graph', ENGINES)
+        self.assertIn('compiled', ENGINES)
+
+        register_engine('testing', CompiledEngine)
+        try:
+            nn = GinNeuralNet(self.observers, self.weightset, engine='testing')
+            self.assertIsInstance(nn.engine, CompiledEngine)
+            self.assert_same_outputs(nn)
+        finally:
+            del ENGINES['testing']
+            EXACT_ENGINES.remove('testing')
+
+        with self.assertRaises(AssertionError):
+            GinNeuralNet(self.observers, self.weightset, engine='testing')
+
+        # lossy engines are only used by name, never picked for 'auto'
+        for name in ('sparse', 'float32', 'int8'):
+            self.assertNotIn(name, EXACT_ENGINES)
+        register_engine('testing', sparse_engine(0.5), exact=False)
+        try:
+            self.assertIn('testing', ENGINES)
+            self.assertNotIn('testing', EXACT_ENGINES)
+        finally:
+            del ENGINES['testing']
+
+    def test_benchmark_engines(self):
+        timings = benchmark_engines(['graph', 'compiled'], pulses=5)
+        self.assertEqual(['compiled', 'graph'], sorted(timings.keys()))
+        for name in timings:
+            self.assertGreater(timings[name], 0)
+
+    def test_select_engine(self):
+        from topology import Topology
+
+        # an engine we already picked is reused without benchmarking again
+        previous = dict(selected_engines)
+        try:
+            selected_engines[Topology().describe()] = 'delta'
+            self.assertEqual('delta', select_engine())
+            self.assertIsInstance(GinNeuralNet(self.observers, self.weightset, engine='auto').engine, DeltaEngine)
+
+            selected_engines.clear()
+            self.assertIn(select_engine(), EXACT_ENGINES)
+        finally:
+            selected_engines.clear()
+            selected_engines.update(previous)
+
+    def test_select_engine_for_topology(self):
+        from topology import Topology
+
+        # an engine that only runs two hidden layers under the exact sigmoid, and is faster than any other
+        class TwoLayerEngine(object):
+            def __init__(self, weightset, input_weights):
+                assert 'jidden' in weightset.names() and activation.mode == 'exact', "unsupported topology"
+
+            def evaluate(self, inputs, rows=None):
+                return [0.5] * (4 if rows is None else len(rows))
+
+        previous = dict(selected_engines)
+        register_engine('testing', TwoLayerEngine)
+        try:
+            selected_engines.clear()
+            self.assertEqual('testing', select_engine(Topology()))
+
+            # each topology is picked for separately, from the engines that can build it
+            for topology in (Topology(hidden=[8]), Topology(activation_mode='table')):
+                self.assertNotEqual('testing', select_engine(topology))
+                self.assertIn(select_engine(topology), EXACT_ENGINES)
+                nn = topology.build(self.observers, GeneSet(topology.genome_length()), 'auto')
+                nn.pulse()
+        finally:
+            del ENGINES['testing']
+            EXACT_ENGINES.remove('testing')
+            selected_engines.clear()
+            selected_engines.update(previous)
+
+
+class TestSparseEngine(EngineTestHelper):
+    def test___init__(self):
+        engine = SparseEngine(self.weightset, self.reference.gather_input_weights(), threshold=0)
+        self.assertEqual(1.0, engine.density())
+
+        engine = SparseEngine(self.weightset, self.reference.gather_input_weights(), threshold=0.5)
+        kept = 0
+        for name in ('hidden', 'jidden', 'output'):
+            for row in self.weightset.weights[name]:
+                kept += len([weight for weight in row if abs(weight) >= 0.5])
+        self.assertEqual(kept, engine.kept)
+        self.assertLess(engine.density(), 1.0)
+
+    def test_evaluate(self):
+        nn = GinNeuralNet(self.observers, self.weightset, engine=sparse_engine(0))
+        self.assert_same_outputs(nn)
+        self.change_state()
+        self.assert_same_outputs(nn)
+        self.assert_same_heads(nn)
+
+        # pruning is the same as zeroing out the small weights
+        nn = GinNeuralNet(self.observers, self.weightset, engine=sparse_engine(0.5))
+        for name in ('hidden', 'jidden', 'output'):
+            for row in self.weightset.weights[name]:
+                for j in range(len(row)):
+                    if abs(row[j]) < 0.5:
+                        row[j] = 0.0
+        self.reference = GinNeuralNet(self.observers, self.weightset)
+        self.assert_same_outputs(nn)
+
+    def test_sparsity_report(self):
+        rows = sparsity_report(self.weightset, thresholds=[0.1, 1.0], pulses=5)
+        self.assertEqual([0.1, 1.0], [row['threshold'] for row in rows])
+        self.assertGreater(rows[0]['density'], rows[1]['density'])
+        for row in rows:
+            self.assertGreater(row['speedup'], 0)
+            self.assertGreaterEqual(row['agreement'], 0)
+            self.assertLessEqual(row['agreement'], 1)
+        self.assertIn('threshold', draw_sparsity_report(rows))
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestCompactEngine(EngineTestHelper):
+    def test___init__(self):
+        input_weights = self.reference.gather_input_weights()
+        engine = CompactEngine(self.weightset, input_weights, 'float32')
+        self.assertEqual(numpy.float32, engine.layers[1][0].dtype)
+
+        engine = CompactEngine(self.weightset, input_weights, 'int8')
+        self.assertEqual(numpy.int8, engine.layers[1][0].dtype)
+
+        # quantizing loses at most half a step per weight
+        weights, scale = engine.layers[1]
+        for i in range(self.num_hidden):
+            for j in range(self.num_inputs):
+                self.assertLessEqual(abs(weights[i][j] * scale - self.weightset.weights['hidden'][i][j]),
+                                     scale / 2 + 1e-6)
+
+        # an eighth of the float64 weights, plus the scales
+        genes = self.num_inputs + self.num_hidden * (self.num_inputs + self.num_hidden + self.num_outputs)
+        self.assertEqual(genes + 4 * 4, engine.nbytes())
+
+        with self.assertRaises(AssertionError):
+            CompactEngine(self.weightset, input_weights, 'float16')
+
+    def test_evaluate(self):
+        for precision, places in (('float32', 5), ('int8', 1)):
+            nn = GinNeuralNet(self.observers, self.weightset, engine=precision)
+            self.reference.pulse()
+            nn.pulse()
+            for key in self.reference.outputs:
+                self.assertAlmostEqual(self.reference.outputs[key], nn.outputs[key], places)
+
+            heads = nn.evaluate_decision('end')
+            for key in heads:
+                self.assertAlmostEqual(self.reference.outputs[key], heads[key], places)
+
+    def test_precision_report(self):
+        rows = precision_report(self.weightset, pulses=5)
+        self.assertEqual(['float64 lists', 'float32', 'int8'], [row['precision'] for row in rows])
+        self.assertGreater(rows[0]['bytes'], rows[1]['bytes'])
+        self.assertGreater(rows[1]['bytes'], rows[2]['bytes'])
+        self.assertIn('int8', draw_precision_report(rows))
@@ -32,9 +32,14 @@ class MockNeuralNetwork(object):
                         'action_end':               action_end,
                         'index':                    index,
                         'accept_improper_knock':    accept_improper_knock}
+        self.inputs = [0] * 49
+        self.pulses = 0
 
-    def pulse(self):
-        pass
+    def pulse(self, keys=None):
+        self.pulses += 1
+
+    def gather_inputs(self):
+        return self.inputs
 
 
 class NeuralNetTestHelper(unittest.TestCase):
@@ -217,6 +222,63 @@ class TestNeuralNet(unittest.TestCase):
             self.assertGreaterEqual(value, 0)
             self.assertLessEqual(value, 1)
 
+    def test_pulse_sees_new_observations(self):
+        self.nn = NeuralNet(self.observers, self.weightset, self.output_keys)
+        self.nn.pulse()
+        before = dict(self.nn.outputs)
+
+        # empty out a hand slot and make sure the next pulse notices
+        self.p.discard_card(self.p.hand.get_card_at_index(0))
+        self.p.noop_notify()
+        self.nn.pulse()
+        self.assertNotEqual(before, self.nn.outputs)
+
+    def test_attach(self):
+        other_player = GinPlayer()
+        other_player.table = GinTable()
+        for _ in range(11):
+            other_player.draw()
+        other_observers = [Observer(other_player)]
+
+        for engine in ('graph', 'compiled'):
+            self.nn = NeuralNet(self.observers, self.weightset, self.output_keys, engine=engine)
+            attached = self.nn.attach(other_observers)
+            self.assertIs(self.nn.weightset, attached.weightset)
+            self.assertIs(self.nn.engine, attached.engine)
+            self.assertIsNot(self.nn.outputs, attached.outputs)
+
+            # the attached network reads the new observers, just like one built over them
+            fresh = NeuralNet(other_observers, self.weightset, self.output_keys, engine=engine)
+            fresh.pulse()
+            attached.pulse()
+            for key in self.output_keys:
+                self.assertAlmostEqual(fresh.outputs[key], attached.outputs[key], 10)
+
+        with self.assertRaises(AssertionError):
+            self.nn.attach(self.observers + other_observers)
+
+    def test_pulse_keys(self):
+        self.nn = NeuralNet(self.observers, self.weightset, self.output_keys)
+        for key in self.output_keys:
+            self.nn.outputs[key] = -1
+
+        # only the output neurons asked for get computed
+        self.nn.pulse(['index'])
+        self.assertNotEqual(-1, self.nn.outputs['index'])
+        self.assertEqual([-1] * 3, [self.nn.outputs[key] for key in self.output_keys if key != 'index'])
+
+        heads = self.nn.evaluate_heads(['action_end', 'index'])
+        self.assertEqual(['action_end', 'index'], sorted(heads.keys()))
+        self.assertEqual(-1, self.nn.outputs['action_start'])
+
+        # and they agree with a full pulse
+        self.nn.pulse()
+        for key in heads:
+            self.assertEqual(self.nn.outputs[key], heads[key])
+
+        with self.assertRaises(AssertionError):
+            self.nn.evaluate_heads(['nonexistent'])
+
 
 class TestGinNeuralNet(unittest.TestCase):
     def setUp(self):
@@ -233,6 +295,12 @@ class TestGinNeuralNet(unittest.TestCase):
     def test___init__(self):
         self.assertEqual(len(self.gnn.outputs), len(self.output_keys))
 
+    def test_evaluate_decision(self):
+        self.assertEqual(['action_end', 'index'], sorted(self.gnn.evaluate_decision('end').keys()))
+        self.assertEqual(['accept_improper_knock'], self.gnn.evaluate_decision('accept_improper_knock').keys())
+        with self.assertRaises(AssertionError):
+            self.gnn.evaluate_decision('middle')
+
 
 class TestPerceptron(unittest.TestCase):
     def setUp(self):
@@ -439,6 +507,35 @@ class TestWeightSet(unittest.TestCase):
         self.assertGreaterEqual(len(w.weights['jidden'][0]), num_inputs)
         self.assertGreaterEqual(len(w.weights['output'][0]), num_hidden)
 
+    def test_view(self):
+        num_inputs, num_hidden, num_outputs = 10, 15, 3
+        gs1 = GeneSet(1000)
+        w = WeightSet(gs1, num_inputs, num_hidden, num_outputs)
+
+        # the genes aren't copied, each layer starts where the last one ended
+        self.assertIs(gs1.genes, w.genes)
+        self.assertEqual(gs1.genes[:num_inputs].tolist(), w.layer('input'))
+        self.assertEqual(gs1.genes[num_inputs:2 * num_inputs].tolist(), w.row('hidden', 0))
+        offset = num_inputs + num_hidden * num_inputs + num_hidden * num_hidden
+        self.assertEqual(gs1.genes[offset + num_hidden:offset + 2 * num_hidden].tolist(), w.row('output', 1))
+
+        # and changes to the genes show through
+        gs1.genes[num_inputs + num_inputs + 2] = 42.0
+        self.assertEqual(42.0, w.row('hidden', 1)[2])
+        if numpy is not None:
+            self.assertEqual((num_hidden, num_inputs), w.matrix('hidden').shape)
+            self.assertEqual(42.0, w.matrix('hidden')[1][2])
+
+        # pruning and validating (as building a network does) don't need the nested lists
+        w.prune(num_inputs, num_hidden, num_outputs)
+        self.assertTrue(w.validate(num_inputs, num_hidden, num_outputs))
+        self.assertIsNone(w.weight_lists)
+
+        # once they are made, they're what we read from
+        w.weights['hidden'][1][2] = -1.0
+        self.assertEqual(-1.0, w.row('hidden', 1)[2])
+        self.assertEqual(42.0, gs1.genes[num_inputs + num_inputs + 2])
+
     def test_prune(self):
         num_inputs = 10
         num_hidden = 15
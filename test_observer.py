@@ -57,6 +57,22 @@ class TestObservable(unittest.TestCase):
         self.p.noop_notify()
         self.assertEqual(3, mobs.times_called)
 
+    def test_notify_organizes_once(self):
+        first, second = Observer(self.p), Observer(self.p)
+        organized = []
+        organize_data = self.p.organize_data
+
+        def counting_organize_data():
+            organized.append(True)
+            return organize_data()
+        self.p.organize_data = counting_organize_data
+
+        # every observer is handed the same data, organized once
+        self.p._add_card(self.c1)
+        self.assertEqual(1, len(organized))
+        self.assertIs(first.buffer, second.buffer)
+        self.assertIn(self.c1.ranking(), first.buffer.values())
+
 
 # noinspection PyProtectedMember
 class TestObserver(unittest.TestCase):
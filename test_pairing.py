@@ -0,0 +1,70 @@
+import unittest
+from genetic_algorithm import *
+
+
+class TestPairing(unittest.TestCase):
+    def setUp(self):
+        self.p = Population(40, 9)
+        self.members = self.p.member_genes.keys()
+
+    def all_pairings(self, schedule):
+        return [pairing for pairings in schedule.rounds(self.p) for pairing in pairings]
+
+    # no member plays itself, and no pair plays twice
+    def assert_distinct(self, pairings):
+        for challenger, defender in pairings:
+            self.assertIsNot(challenger, defender)
+        self.assertEqual(len(pairings), len(set([frozenset(pairing) for pairing in pairings])))
+
+    def test_round_robin(self):
+        pairings = self.all_pairings(RoundRobinSchedule())
+        self.assertEqual(9 * 8 / 2, len(pairings))
+        self.assert_distinct(pairings)
+
+        # several hundred members are scheduled in no time
+        p = Population(4, 400)
+        started = time.time()
+        self.assertEqual(400 * 399 / 2, len(list(RoundRobinSchedule().rounds(p))[0]))
+        self.assertLess(time.time() - started, 1)
+
+    def test_sampled(self):
+        pairings = self.all_pairings(SampledSchedule(3))
+        self.assert_distinct(pairings)
+
+        # each member plays at least its k opponents
+        for member in self.members:
+            self.assertGreaterEqual(len([pairing for pairing in pairings if member in pairing]), 3)
+
+        # more opponents than there are members is everyone
+        self.assertEqual(9 * 8 / 2, len(self.all_pairings(SampledSchedule(20))))
+
+    def test_swiss(self):
+        rounds = SwissSchedule(3).rounds(self.p)
+        pairings = []
+        for i in range(3):
+            round_pairings = rounds.next()
+            pairings += round_pairings
+
+            # with 9 members, at most 8 play each round (fewer if the last ones left have met), each of them once
+            players = [member for pairing in round_pairings for member in pairing]
+            self.assertEqual(len(players), len(set(players)))
+            self.assertGreaterEqual(len(round_pairings), 3)
+
+            # two members who haven't met take the lead, so they're paired next round
+            if i == 0:
+                leaders = set([round_pairings[0][0], round_pairings[1][0]])
+                for member in leaders:
+                    self.p.member_genes[member].update({'game_wins': 5, 'game_points': 100})
+            elif i == 1:
+                self.assertEqual(leaders, set(round_pairings[0]))
+
+        self.assert_distinct(pairings)
+        self.assertRaises(StopIteration, rounds.next)
+
+    def test_fitness_test(self):
+        p = Population(4000, 6, engine='compiled', schedule=SwissSchedule(2))
+        p.fitness_test()
+        # 3 matches a round, unless the last two left in the second round met in the first
+        matches = p.topology_costs.values()[0]['matches']
+        self.assertIn(matches, (5, 6))
+        self.assertEqual(matches, sum([stats['match_wins'] for stats in p.member_genes.values()]))
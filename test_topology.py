@@ -0,0 +1,95 @@
+import unittest
+from topology import *
+from genetic_algorithm import *
+from test_neuralengine import EngineTestHelper
+
+
+class TestTopology(EngineTestHelper):
+    def test___init__(self):
+        # by default, the network we've always built
+        topology = Topology()
+        self.assertEqual(self.num_inputs, topology.inputs)
+        self.assertEqual([self.num_hidden, self.num_hidden], topology.hidden)
+        self.assertEqual(self.num_outputs, topology.outputs)
+
+        with self.assertRaises(AssertionError):
+            Topology(hidden=[])
+        with self.assertRaises(AssertionError):
+            Topology(activation_mode='relu')
+
+    def test_genome_length(self):
+        expected = self.num_inputs + self.num_hidden * (self.num_inputs + self.num_hidden + self.num_outputs)
+        self.assertEqual(expected, Topology().genome_length())
+        self.assertEqual(self.num_inputs + 10 * self.num_inputs + 4 * 10, Topology(hidden=[10]).genome_length())
+
+    def test_weightset(self):
+        # laid out just like a WeightSet built from the layer sizes
+        geneset = GeneSet(4000)
+        weightset = Topology().weightset(geneset)
+        expected = WeightSet(geneset, self.num_inputs, self.num_hidden, self.num_outputs)
+        self.assertEqual(expected.weights, weightset.weights)
+
+        weightset = Topology(hidden=[10]).weightset(geneset)
+        self.assertEqual(['input', 'hidden', 'output'], weightset.names())
+        self.assertEqual((4, [10] * 4), weightset.shape('output'))
+
+    def test_build(self):
+        # a single hidden layer network agrees across engines
+        topology = Topology(hidden=[12])
+        geneset = GeneSet(topology.genome_length())
+        reference = topology.build(self.observers, geneset, 'graph')
+        self.assertEqual([], reference.jidden_layer)
+        self.assertEqual(12, len(reference.hidden_layer))
+
+        for engine in ('compiled', 'delta', sparse_engine(0)) + (('numpy', 'float32') if numpy is not None else ()):
+            nn = topology.build(self.observers, geneset, engine)
+            reference.pulse()
+            nn.pulse()
+            for key in reference.outputs:
+                self.assertAlmostEqual(reference.outputs[key], nn.outputs[key], 5)
+
+        # built under its own activation mode, leaving the global one alone
+        nn = Topology(activation_mode='table').build(self.observers, GeneSet(4000), 'graph')
+        self.assertIs(activation.sigmoid_table, nn.hidden_layer[0].activation)
+        self.assertEqual('exact', activation.mode)
+
+        # Perceptron.sigmoid stays the exact sigmoid, whichever mode a perceptron was built under
+        self.assertEqual(activation.sigmoid_exact(0.3), nn.hidden_layer[0].sigmoid(0.3))
+        self.assertNotEqual(nn.hidden_layer[0].sigmoid(0.3), nn.hidden_layer[0].activation(0.3))
+
+        # attached to other observers, its Perceptrons are built again under the same mode
+        attached = Topology(activation_mode='table').attach(nn, [Observer(self.p2), Observer(self.match.table),
+                                                                  Observer(self.match)])
+        self.assertIs(activation.sigmoid_table, attached.hidden_layer[0].activation)
+        self.assertEqual('exact', activation.mode)
+
+    def test_describe(self):
+        self.assertEqual('49-35-35-4 exact', Topology().describe())
+        self.assertEqual(Topology(), Topology())
+        self.assertNotEqual(Topology(), Topology(hidden=[35]))
+
+
+class TestPopulationTopology(unittest.TestCase):
+    def test_fitness_test(self):
+        topology = Topology(hidden=[8])
+        p = Population(None, 3, engine='compiled', topology=topology)
+        self.assertEqual(topology.genome_length(), len(p.member_genes.keys()[0].genes))
+
+        # each fitness test is charged to the topology
+        p.fitness_test()
+        p.fitness_test()
+        costs = p.topology_costs['49-8-4 exact']
+        self.assertEqual(topology.genome_length(), costs['genome_length'])
+        self.assertEqual(2, costs['generations'])
+        self.assertEqual(6, costs['matches'])
+        self.assertGreater(costs['seconds_per_pulse'], 0)
+        self.assertIn('49-8-4 exact', p.draw_costs())
+
+    def test_persist(self):
+        filename = '/tmp/test_persist_topology.txt'
+        p = Population(None, 2, local_storage=filename, topology=Topology(hidden=[8]))
+        p.persist(action='store')
+
+        restored = Population(None, 2, local_storage=filename)
+        restored.persist(action='load')
+        self.assertEqual(Topology(hidden=[8]), restored.topology)
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+#
+# topology.py
+#
+# 2026/10/18
+# rg
+#
+# the shape of a population's networks, declared in one place: the input width (the Observers' widths summed), one or
+# two hidden layers and their widths, the output width and the sigmoid's activation mode (see activation.py). a
+# Population keeps its Topology, lays each member's genes out by it and records what its networks cost to run.
+
+from neuralnet import *
+import activation
+
+
+class Topology(object):
+    # hidden is a list of one or two hidden layer widths. by default there are two, each 2/3 of inputs + outputs.
+    def __init__(self, inputs=None, hidden=None, outputs=None, activation_mode=None):
+        if inputs is None:
+            inputs = 11 + 33 + 5
+        if outputs is None:
+            outputs = 4
+        if hidden is None:
+            hidden = [int((inputs + outputs) * (2.0 / 3.0))] * 2
+        if activation_mode is None:
+            activation_mode = 'exact'
+        assert len(hidden) in (1, 2), "a topology has one or two hidden layers"
+        assert activation_mode in activation.MODES, "unknown activation mode: " + str(activation_mode)
+
+        self.inputs = inputs
+        self.hidden = list(hidden)
+        self.outputs = outputs
+        self.activation_mode = activation_mode
+
+    # (name, rows, columns) for each layer's weights, in the order they're laid out in the genes
+    def layers(self):
+        layers = [('input', 1, self.inputs), ('hidden', self.hidden[0], self.inputs)]
+        if len(self.hidden) > 1:
+            layers.append(('jidden', self.hidden[1], self.hidden[0]))
+        layers.append(('output', self.outputs, self.hidden[-1]))
+        return layers
+
+    # the number of genes a network of this shape reads
+    def genome_length(self):
+        return sum([rows * columns for name, rows, columns in self.layers()])
+
+    # the given GeneSet's genes, laid out as weights for this shape
+    def weightset(self, geneset):
+        return WeightSet(geneset, layers=self.layers(), topology=self)
+
+    # call function with the given arguments under our activation mode, leaving the global one as it was
+    def in_mode(self, function, *args):
+        previous_mode = activation.mode
+        activation.set_mode(self.activation_mode)
+        try:
+            return function(*args)
+        finally:
+            activation.set_mode(previous_mode)
+
+    # a GinNeuralNet of this shape over the given GeneSet, built under our activation mode
+    def build(self, observers, geneset, engine=None):
+        return self.in_mode(GinNeuralNet, observers, self.weightset(geneset), engine)
+
+    # a network we built, reading from another set of observers. a graph network's Perceptrons are built again, so
+    # this is under our activation mode too.
+    def attach(self, nn, observers):
+        return self.in_mode(nn.attach, observers)
+
+    # seconds per pulse for a random network of this shape, over a series of recorded game states
+    def measure_cost(self, engine=None, pulses=100):
+        from genetic_algorithm import GeneSet
+
+        observers, states = record_states(pulses)
+        nn = self.build(observers, GeneSet(self.genome_length()), engine)
+        return time_pulses(nn, observers, states)
+
+    # e.g. 49-35-35-4 exact
+    def describe(self):
+        return '-'.join([str(width) for width in [self.inputs] + self.hidden + [self.outputs]]) + ' ' + \
+            self.activation_mode
+
+    # a dict of plain values we can be rebuilt from by from_spec()
+    def spec(self):
+        return {'kind': 'dense', 'inputs': self.inputs, 'hidden': list(self.hidden), 'outputs': self.outputs,
+                'activation_mode': self.activation_mode}
+
+    @staticmethod
+    def from_spec(spec):
+        spec = dict(spec)
+        kind = spec.pop('kind')
+        assert kind in TOPOLOGIES, "unknown topology: " + str(kind)
+        return TOPOLOGIES[kind](**dict([(str(key), value) for key, value in spec.items()]))
+
+    def __eq__(self, other):
+        return isinstance(other, Topology) and self.describe() == other.describe()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.describe())
+
+
+# each kind of Topology by the name its spec() gives
+TOPOLOGIES = {'dense': Topology}